@@ -65,6 +65,8 @@ class RecordableCommunicatorBase(object):
     REC_FN_MON = 'mon'
     REC_HEADER_SEQ = '# File format raw address, ISI (us)'
     REC_HEADER_MON = '# File format raw address, timestamp (us)'
+    #'npy' (np.save) or 'aer' (binary AER files, see pyST.STas.aerFile)
+    REC_FORMAT = 'npy'
 
     def __init__(self):
         self._rec_fns = []
@@ -107,18 +109,29 @@ class RecordableCommunicatorBase(object):
         #CONVIENIENCE FUNCTION, IMPLEMENTATION NOT REQUIRED
         stim_fn, mon_fn = self.__gen_rec_fns()
         #Save stim before in case something goes wrong        
-        self.__save_rec_file(stimulus, stim_fn)
+        self.__save_rec_file(stimulus, stim_fn, 'seq', isi=True)
         mon_evs = self.run(stimulus = stimulus, *args, **kwargs)
-        self.__save_rec_file(mon_evs, mon_fn)
+        self.__save_rec_file(mon_evs, mon_fn, 'mon')
 
         return mon_evs
 
-    def __save_rec_file(self, ev_array, filename):
+    def __save_rec_file(self, ev_array, filename, chaddr=None, isi=False):
         '''
-        Save data using np.save, and adds filename in self._record_fns
+        Save data using np.save (or save_aer if REC_FORMAT is 'aer'), and adds filename in self._record_fns
+        *chaddr*: 'seq' or 'mon', the channelAddressing of the registered NeuroSetup saved in AER files
         '''
-        self._rec_fns.append(filename+'.npy')
-        numpy.save(filename, ev_array)
+        if self.REC_FORMAT == 'aer':
+            from ..pyST.STas import save_aer
+            nsetup = getattr(self, '_neurosetup', None)
+            if nsetup is not None and chaddr is not None:
+                chaddr = getattr(nsetup, chaddr)
+            else:
+                chaddr = None
+            self._rec_fns.append(filename+'.aer')
+            save_aer(filename+'.aer', ev_array, chaddr, isi=isi)
+        else:
+            self._rec_fns.append(filename+'.npy')
+            numpy.save(filename, ev_array)
 
         self._run_id += 1
 
@@ -14,6 +14,7 @@
 from __future__ import absolute_import
 from .BaseConfAPI import *
 from .ComAPI import ResourceManagerBase
+import functools
 
 
 
@@ -194,7 +195,39 @@ class ConfiguratorBase(ResourceManagerBase):
                 format(e.message))
 
 
+def _forget_uploaded_table(func):
+    '''
+    Wraps a method modifying the mapping table, such that the table recorded
+    by pyNCS.Mapping.upload is forgotten
+    '''
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        self._uploaded_table = None
+        return func(self, *args, **kwargs)
+    return wrapper
+
+
+class _MappingsMeta(type):
+    '''
+    Metaclass of MappingsBase: the methods modifying the mapping table are
+    wrapped with _forget_uploaded_table, also when they are overridden.
+    '''
+    modifiers = ['add_mappings', 'set_mappings', 'clear_mappings',
+                 'remove_mappings', 'del_mappings']
+
+    def __new__(meta, name, bases, dct):
+        for k in meta.modifiers:
+            if k in dct:
+                dct[k] = _forget_uploaded_table(dct[k])
+        return type.__new__(meta, name, bases, dct)
+
+
 class MappingsBase(ResourceManagerBase):
+    __metaclass__ = _MappingsMeta
+    # Table last uploaded by pyNCS.Mapping.upload, None if the mapping table
+    # was modified otherwise since then
+    _uploaded_table = None
+
     def __init__(self):
         '''
         MappingsBase()
@@ -205,6 +238,7 @@ class MappingsBase(ResourceManagerBase):
         - set_mappings(mappings) (optional)
         - get_mappings()
         - clear_mappings()
+        - remove_mappings(mappings) (optional)
         - del_mappings() (optional, not used by pyNCS by default)
         '''
         ResourceManagerBase.__init__(self)
@@ -244,6 +278,18 @@ class MappingsBase(ResourceManagerBase):
         self.clear_mappings()
         self.add_mappings(mappings)
 
+    def remove_mappings(self, mappings):
+        #IMPLEMENT (OPTIONAL)
+        '''
+        Removes *mappings* from the mappings table. When implemented, pyNCS
+        updates the mapping table by adding and removing the connections that
+        changed, instead of setting the whole table.
+
+        Inputs:
+        *mappings*: a two-dimenstional iterable
+        '''
+        raise NotImplementedError('remove_mappings has not been implemented')
+
     def del_mappings(self):
         #IMPLEMENT (OPTIONAL)
         '''
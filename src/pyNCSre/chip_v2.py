@@ -16,6 +16,7 @@ from .api.ConfAPI import Configurator
 from contextlib import contextmanager
 from lxml import etree
 from re import search as res
+import numpy as np
 
 
 class Block():
@@ -121,6 +122,7 @@ class NeuronBlock():
         '''
         self.neurochip = neurochip
         self.synapses = {}
+        self._synapse_grids = {}
 
     def __generateFromXml__(self, xml):
         '''
@@ -141,6 +143,7 @@ class NeuronBlock():
             self.soma.addresses = self.expand_dims()
 
             self.synapses = {}
+            self._synapse_grids = {}
             for i in self.domdoc.getElementsByTagName('synapse'):
                 group_id = i.getAttribute('id')
                 group = Block(self.neurochip)
@@ -178,6 +181,7 @@ class NeuronBlock():
             assert doc.tag == 'neuron'
         self.id = doc.get('id')
         self.synapses = {}
+        self._synapse_grids = {}
         for elm in doc:
             if elm.tag == 'soma':
                 group = Block(self.neurochip)
@@ -215,7 +219,27 @@ class NeuronBlock():
                 dims_array.append(s.dims[k])  # do it with dict.values()!
         if not len(dims_array) > 0:
             raise Exception('Block has no dimension.')
-        return _buildGrid(dims_array)
+        return _buildGrid(dims_array, memoize=True)
+
+    def synapse_grid(self, synapses):
+        """
+        Returns all the combinations of the dims of the given synapses as a
+        (read-only) structured array, with fields in the order of the dims of
+        the first synapse. Computed once per list of synapses.
+        """
+        key = tuple(synapses)
+        if key not in self._synapse_grids:
+            names = self.synapses[synapses[0]].dims.keys()
+            # NOTE: the str type cast is because numpy dtype doesn't support
+            # unicode strings
+            dtp = np.dtype([(str(k), 'uint32') for k in names])
+            grid = np.concatenate([
+                _buildGrid([self.synapses[s].dims[k] for k in names])
+                for s in synapses])
+            grid = grid.view(dtp)[:, 0]
+            grid.setflags(write=False)
+            self._synapse_grids[key] = grid
+        return self._synapse_grids[key]
 
 
 class Chip:
@@ -56,7 +56,7 @@ class Connection(object):
                                      (popsrc.name, popdst.name, synapse))
 
     def __len__(self):
-        return len(self.mapping.mapping)
+        return len(self.mapping)
 
     def __repr__(self):
         return "Connection object: {0} -> {1} via {2}".format(self.popsrc.name,
@@ -72,7 +72,7 @@ class Connection(object):
         dstindx = {j:i for i,j in enumerate(self.popdst.synapses[self.synapse].paddr)}
         conn_matrix = np.zeros((len(self.popdst.synapses[self.synapse]),
                                 len(self.popsrc.soma)))
-        for src, dst in np.array(self.mapping.mapping)[:,:2]:
+        for src, dst in self.mapping.mapping_array()[:,:2]:
             conn_matrix[dstindx[dst], srcindx[src]] += 1
         pylab.colorbar(pylab.pcolor(conn_matrix))
         pylab.xlabel(self.popsrc.name)
@@ -11,7 +11,38 @@ import itertools
 from warnings import warn
 from .pyST import *
 
+#Maximum number of addresses memoized per address specification
+ADDR_CACHE_SIZE = 2 ** 20
+
+
+def _construct_cached(stas, kind, addr, construct):
+    '''
+    Returns construct(), the encoding of the struct addresses addr, memoized
+    in stas.addrConstructCache by kind and content of addr. Memoized arrays
+    are read-only since they are shared between groups. Encodings of more
+    than ADDR_CACHE_SIZE addresses are not memoized.
+    '''
+    key = (kind, addr.dtype, addr.tostring())
+    try:
+        return stas.addrConstructCache[key]
+    except KeyError:
+        pass
+    ad = construct()
+    if len(ad) > ADDR_CACHE_SIZE:
+        return ad
+    ad.setflags(write=False)
+    if stas.addrConstructCacheSize + len(ad) > ADDR_CACHE_SIZE:
+        stas.addrConstructCache.clear()
+        stas.addrConstructCacheSize = 0
+    stas.addrConstructCacheSize += len(ad)
+    stas.addrConstructCache[key] = ad
+    return ad
+
+
 class AddrGroupBase(object):
+    # addr array whose addresses are known to be in range, see _trusted
+    _valid_addr = None
+
     def __init__(self, name, description=None):
         if description:
             self.description = description
@@ -34,17 +65,42 @@ class AddrGroupBase(object):
         '''
         Return an exact copy of the group.
         '''
+        return self._take(slice(None))
+
+    def _take(self, i):
+        '''
+        Returns a new group with addresses self.addr[i]. The logical and
+        physical addresses already computed are carried over (as views of
+        self's when i is a slice) instead of being constructed again.
+        '''
+        if not isinstance(i, slice) and not hasattr(i, '__len__'):
+            if not -len(self.addr) <= i < len(self.addr):
+                raise IndexError('AddrGroup index out of range')
+            i = slice(i, i + 1 or None)
         g = AddrGroup(self.name, self.description)
         g._channel = self._channel
         g.chipid = self.chipid
-        g.addr = self.addr.copy()
+        g.addr = np.array(self.addr[i], dtype=self.dtype)
         g.setup = self.setup
         g.addrspec = self.addrspec
         g.grouptype = self.grouptype
         g.dtype = self.dtype
-        g.repopulate()
+        if self._paddr is not None:
+            g._paddr = self._paddr[i]
+        if self._laddr is not None:
+            g._laddr = self._laddr[i]
+        if self._trusted():
+            g._valid_addr = g.addr
         return g
 
+    def _trusted(self):
+        '''
+        True if the addresses of the group are known to be in range, because
+        they were checked when encoding them or taken from the chip's
+        specification. Encoding them again then skips isValidAddress.
+        '''
+        return self._valid_addr is not None and self._valid_addr is self.addr
+
     @property
     def channel(self):
         return self._channel
@@ -86,39 +142,13 @@ class AddrGroupBase(object):
         """
         x.__getitem__(i) ==> x[i]
         """
-        g = self.__copy__()
-        if isinstance(i, slice):
-            g.addr = self.addr[i].copy()
-            if self._paddr != None:
-                g._paddr = self._paddr[i]
-            if self._laddr != None:
-                g._laddr = self._laddr[i]
-        else:
-            if hasattr(i, '__len__'):
-                g.addr = np.array(self.addr[i])
-                if self._paddr != None:
-                    g._paddr = np.array(self._paddr[i], dtype='uint32')
-                if self._laddr != None:
-                    g._laddr = np.array(self._laddr[i], dtype='float')
-            else:
-                g.addr = np.array([self.addr[i]], dtype=self.dtype)
-                if self._paddr != None:
-                    g._paddr = np.array([self._paddr[i]], dtype='uint32')
-                if self._laddr != None:
-                    g._laddr = np.array([self._laddr[i]], dtype='float')
-        return g
+        return self._take(i)
 
     def __getslice__(self, i, j):
         """
         x.__getslice__(i, j) ==> x[i:j]
         """
-        g = self.__copy__()
-        g.addr = self.addr[i:j]
-        if self._paddr != None:
-            g._paddr = self._paddr[i:j]
-        if self._laddr != None:
-            g._laddr = self._laddr[i:j]
-        return g
+        return self._take(slice(i, j))
 
 
     def sort(self, order=None):
@@ -232,7 +262,7 @@ class AddrGroup(AddrGroupBase):
 
     @property
     def channel(self):
-        if self._channel == None:
+        if self._channel is None:
             # if it is None generate the necesary addresses
             if self.grouptype == 'in':
                 self._channel =\
@@ -269,7 +299,7 @@ class AddrGroup(AddrGroupBase):
 #
 #        raise NotImplementedError
 
-    def __populate__(self, setup, chipid, grouptype, addresses=[]):
+    def __populate__(self, setup, chipid, grouptype, addresses=[], trusted=False):
 
         self.chipid = chipid
         self.grouptype = grouptype
@@ -287,6 +317,8 @@ class AddrGroup(AddrGroupBase):
         self._paddr = None  # np.array([],dtype='uint32')
         self._laddr = None  # np.array([],dtype='float')
         self.add(addresses)
+        if trusted:
+            self._valid_addr = self.addr
     
     def _get_dtype(self, setup, chipid, grouptype):
         '''
@@ -306,8 +338,13 @@ class AddrGroup(AddrGroupBase):
         return np.dtype(dtp)
 
 
-    def populate_line(self, setup, chipid, grouptype, addresses):
-        self.__populate__(setup, chipid, grouptype, addresses)
+    def populate_line(self, setup, chipid, grouptype, addresses, trusted=False):
+        """
+        Populates the group with the given human readable addresses. Set
+        trusted to True if they are taken from the chip's specification, so
+        that they are not range checked when encoded.
+        """
+        self.__populate__(setup, chipid, grouptype, addresses, trusted)
 
     def populate_rectangle(self, setup, chipid, grouptype, p1, p2, z=None, n=None):
         """
@@ -462,12 +499,13 @@ class AddrGroup(AddrGroupBase):
             print("AddrGroup is empty!")
             return stStim
 
-        for i, id in enumerate(self.laddr):
-            stStim[id] = STCreate.regular_gaussian_generator(rate[i],
-                                                    phase=offset[i],
+        spikes = STCreate.regular_gaussian_population_generator(self.laddr,
+                                                    rate,
+                                                    phase=offset,
                                                     scale=scale,
                                                     t_start=t_start,
                                                     t_stop=t_start + duration)
+        stStim = ColumnarSpikeList(spikes, self.laddr, t_start, t_start + duration)
 
         if channel is None:
             channel = self.channel
@@ -503,12 +541,13 @@ class AddrGroup(AddrGroupBase):
             print("AddrGroup is empty!")
             return stStim
 
-        for i, id in enumerate(self.laddr):
-            stStim[id] = STCreate.regular_generator(rate[i],
-                                                    phase=offset[i],
+        spikes = STCreate.regular_population_generator(self.laddr,
+                                                    rate,
+                                                    phase=offset,
                                                     jitter=jitter,
                                                     t_start=t_start,
                                                     t_stop=t_start + duration)
+        stStim = ColumnarSpikeList(spikes, self.laddr, t_start, t_start + duration)
 
         if channel is None:
             channel = self.channel
@@ -532,9 +571,9 @@ class AddrGroup(AddrGroupBase):
             print("AddrGroup is empty!")
             return stStim
 
-        for i, id in enumerate(self.laddr):
-            stStim[id] = STCreate.poisson_generator(
-                rate[i], t_start=t_start, t_stop=t_start + duration)
+        spikes = STCreate.poisson_population_generator(
+            self.laddr, rate, t_start=t_start, t_stop=t_start + duration)
+        stStim = ColumnarSpikeList(spikes, self.laddr, t_start, t_start + duration)
 
         if channel is None:
             channel = self.channel
@@ -577,9 +616,21 @@ class AddrGroup(AddrGroupBase):
         if self.is_empty():
             print("AddrGroup is empty!")
             return stStim
-        for i, id in enumerate(self.laddr):
-            stStim[id] = STCreate.inh_poisson_generator(rate[i],
-                 t, t_stop=t[-1], base_generator=base_generator, **kwargs)
+
+        # Poisson and regular base processes have population counterparts
+        # generating all the spike trains at once
+        population_generators = {
+            STCreate.poisson_generator: STCreate.poisson_population_generator,
+            STCreate.regular_generator: STCreate.regular_population_generator}
+        if base_generator in population_generators:
+            spikes = STCreate.inh_poisson_population_generator(
+                self.laddr, rate, t, t_stop=t[-1],
+                base_generator=population_generators[base_generator], **kwargs)
+            stStim = ColumnarSpikeList(spikes, self.laddr, t[0], t[-1])
+        else:
+            for i, id in enumerate(self.laddr):
+                stStim[id] = STCreate.inh_poisson_generator(rate[i],
+                     t, t_stop=t[-1], base_generator=base_generator, **kwargs)
 
         if channel is None:
             channel = self.channel
@@ -606,11 +657,16 @@ class AddrGroup(AddrGroupBase):
         '''
         Regenreates Locigal addresses from address list.
         '''
-        if self._laddr != None:
+        if self._laddr is not None:
             return self._laddr
         if len(self.addr) > 0:
-            self._laddr = self.ch_addr[self.channel].addrLogicalConstruct(
-                self.addr.view('uint32').reshape((-1, len(self.dtype))).T)
+            stas = self.ch_addr[self.channel]
+            trusted = self._trusted()
+            self._laddr = _construct_cached(stas, 'logical', self.addr,
+                lambda: stas.addrLogicalConstruct(
+                    self.addr.view('uint32').reshape((-1, len(self.dtype))).T,
+                    trusted=trusted))
+            self._valid_addr = self.addr
         else:
             self._laddr = np.array([], dtype='float')
         return self._laddr
@@ -623,12 +679,18 @@ class AddrGroup(AddrGroupBase):
         '''
         Generates Physical addresses from the address list. To regenerate use self.repopulate
         '''
-        if self._paddr != None:
+        if self._paddr is not None:
             return self._paddr
         if len(self.addr) > 0:
-            self._paddr = self.ch_addr.addrPhysicalConstruct(
-                {self.channel: self.addr.view('uint32').reshape((-1,
-                                                                 len(self.dtype))).T})
+            trusted = self._trusted()
+            self._paddr = _construct_cached(
+                self.ch_addr[self.channel],
+                ('physical', self.ch_addr.getValue(self.channel)), self.addr,
+                lambda: self.ch_addr.addrPhysicalConstruct(
+                    {self.channel: self.addr.view('uint32').reshape((-1,
+                                                                     len(self.dtype))).T},
+                    trusted=trusted))
+            self._valid_addr = self.addr
         else:
             self._paddr = np.array([], dtype='uint32')
         return self._paddr
@@ -13,10 +13,87 @@ import numpy as np
 from warnings import warn
 
 
+def _sample_indices(n, k):
+    """
+    Returns k distinct integers drawn uniformly from range(n), sorted. Memory
+    is proportional to k unless k is a sizeable fraction of n.
+    """
+    if k >= n:
+        return np.arange(n)
+    if 4 * k > n:
+        return np.sort(np.random.permutation(n)[:k])
+    idx = np.zeros(0, 'int64')
+    while len(idx) < k:
+        draw = np.random.randint(0, n, size=k - len(idx) + k // 8 + 1, dtype='int64')
+        idx = np.unique(np.concatenate([idx, draw]))
+    if len(idx) > k:
+        # A uniform subset of a uniform subset is uniform
+        idx = np.sort(np.random.choice(idx, k, replace=False))
+    return idx
+
+
+def _group_rows(table):
+    """
+    Groups the equal rows of table (an uint32 array). Returns, for each row,
+    an id shared by equal rows and smaller than len(table), and the number of
+    equal rows preceding it.
+    """
+    key = np.zeros(len(table), 'uint64')
+    for i, col in enumerate(table.T):
+        if i > 1:
+            # A key holds two uint32, renumber the rows before adding another
+            key = np.unique(key, return_inverse=True)[1].astype('uint64')
+        key = (key << 32) | col
+    order = np.argsort(key, kind='mergesort')
+    key_sorted = key[order]
+    first = np.ones(len(key), 'bool')
+    first[1:] = key_sorted[1:] != key_sorted[:-1]
+    index = np.arange(len(key))
+    ids = np.empty(len(key), 'int')
+    ids[order] = np.cumsum(first) - 1
+    occ = np.empty(len(key), 'int')
+    occ[order] = index - np.maximum.accumulate(np.where(first, index, 0))
+    return ids, occ
+
+
+class _MappingList(list):
+    """
+    The list of connections returned by Mapping.mapping. Modifying the list
+    modifies the mapping table (but not modifying its rows in place).
+    """
+    def __init__(self, rows, owner):
+        list.__init__(self, rows)
+        self._owner = owner
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+def _list_modifier(name):
+    method = getattr(list, name)
+
+    def modifier(self, *args):
+        result = method(self, *args)
+        self._owner._list_changed(self)
+        return result
+    modifier.__name__ = name
+    return modifier
+
+for _name in ['__setitem__', '__delitem__', '__setslice__', '__delslice__',
+              '__iadd__', '__imul__', 'append', 'extend', 'insert', 'pop',
+              'remove', 'reverse', 'sort']:
+    setattr(_MappingList, _name, _list_modifier(_name))
+
+
 class Mapping(object):
     """
     A class representing the mapping between groups of chip addresses.
     """
+    # List handed out by the mapping property and whether it was modified
+    _list = None
+    _list_modified = False
+    # Version and compressed sparse row table of the last mapping_csr call
+    _csr = (None, None)
 
     def __init__(self, name, description=None):
         """
@@ -30,31 +107,102 @@ class Mapping(object):
             self.description = 'This mapping describes the AER connectivity\
                                 between addresses.'
         self.name = "\"" + 'AER connectivity' + "\""
-        self.mapping = []
+        # version is incremented and dirty is raised at every change of the
+        # mapping table
+        self.version = 0
+        self.dirty = True
+        self.clear()
 
     def __getstate__(self):
         """
         """
         d = dict(self.__dict__)
+        # Drop the spare capacity of the table
+        d['_table'] = self.mapping_array()
+        for k in ['_list', '_list_modified', '_csr']:
+            d.pop(k, None)
         return d
 
     def __setstate__(self, dict):
         """
         """
+        legacy = dict.pop('mapping', None)
+        dict.setdefault('version', 0)
+        dict.setdefault('dirty', True)
         self.__dict__ = dict
+        if legacy is not None:
+            # Mappings pickled when the table was a list of lists
+            self.mapping = legacy
+
+    def __get_mapping(self):
+        if self._list is None:
+            self._list = _MappingList(self.mapping_array().tolist(), self)
+        return self._list
+
+    def __set_mapping(self, table):
+        if table is self._list:
+            # e.g. mapping += connections
+            self._list_changed(table)
+            return
+        self._list = None
+        self._list_modified = False
+        self._table = self._as_table(table)
+        self._nconn = len(self._table)
+        self._changed()
+
+    mapping = property(__get_mapping, __set_mapping, doc="""
+        The mapping table, as a list of connections [source, target, ...].
+        Modifying the list modifies the mapping table. After modifying a
+        connection in place (e.g. mapping[0][1] = 3), assign the list back
+        (mapping = mapping). The table is stored as an uint32 array, see
+        mapping_array, which should be preferred when the list is not needed.
+        """)
+
+    def mapping_array(self):
+        '''
+        Returns the mapping table as a two-dimensional uint32 array with one
+        row per connection. The array is a read-only view on the storage of
+        the table (no copy), and is only valid until the table is modified.
+        '''
+        self._sync()
+        table = self._table[:self._nconn]
+        table.setflags(write=False)
+        return table
+
+    def _list_changed(self, lst):
+        if lst is self._list:
+            self._list_modified = True
+            self._changed()
+
+    def _sync(self):
+        # Updates the array storage after the list of connections was modified
+        if self._list_modified:
+            try:
+                table = self._as_table(self._list, copy=False)
+            except ValueError:
+                raise ValueError('The connections of the mapping table have '
+                                 'different numbers of columns')
+            self._table = self._as_table(self.complete(table))
+            self._nconn = len(self._table)
+            self._list_modified = False
+            # Connections may have been added as arrays
+            list.__setslice__(self._list, 0, len(self._list),
+                              self._table.tolist())
+
+    @staticmethod
+    def _as_table(table, copy=True):
+        table = np.array(table, 'uint32', copy=copy, ndmin=2)
+        if table.size == 0:
+            table = np.zeros([0, 2], 'uint32')
+        return table
 
     def __graph_from_mapping__(self):
         raise NotImplementedError
 
     def __len__(self):
-        return len(self.mapping)
-
-    def __toint__(self):
-        """
-        Convert all the elements to int because some numpy functions can return
-        longint.#
-        """
-        self.mapping = [[int(x) for x in v] for v in self.mapping]
+        if self._list_modified:
+            return len(self._list)
+        return self._nconn
 
     def __instance_from_matrix_random(self, M):
         try:
@@ -68,8 +216,8 @@ class Mapping(object):
         Connections must be pyNCS.Connection instancies.
         """
         self.clear()
-        self.mapping = np.concatenate([c.mapping.mapping for c in
-                                       connections_list]).tolist()
+        for c in connections_list:
+            self.extend(c.mapping.mapping_array())
 
     def complete(self, connlist):
         '''
@@ -77,33 +225,63 @@ class Mapping(object):
         '''
         return connlist
 
-    def merge(self, pyncs_mapping):
+    def extend(self, table):
         """
-        Merge the existing mapping with a given one.
+        Appends the connections in table (a two-dimensional iterable with one
+        row per connection) to the mapping table. The storage grows
+        geometrically, so that repeated extensions take linear time overall.
+        If the tables have different numbers of columns, the extra columns
+        (e.g. the probability) are dropped with a warning.
         """
-        # TODO: check for duplicates
-        self.mapping = self.complete(self.mapping)
-        if len(self.mapping) > 0:
-            # check for shape
-            my_cols = np.shape(self.mapping)[1]
-            if len(pyncs_mapping.mapping) > 0:
-                # check for shape
-                their_cols = np.shape(pyncs_mapping.mapping)[1]
-                # check for shape compatibility
-                if my_cols > their_cols:
-                    # Do something
-                    self.mapping.extend(pyncs_mapping.mapping)
-                    self.mapping = self.complete(self.mapping)
-                elif my_cols < their_cols:
-                    warn('Connection cannot be merged. Ignoring probability')
-                    # NOTE: Assuming the only missing dimension is probability
-                    self.mapping = np.concatenate([self.mapping,
-                        np.array(pyncs_mapping.mapping)[:,0:my_cols]]).tolist()
-                else:
-                    self.mapping = np.concatenate([self.mapping,
-                                        pyncs_mapping.mapping]).tolist()
-        else:
-            self.mapping = pyncs_mapping.mapping
+        table = self._as_table(
+            self.complete(self._as_table(table, copy=False)), copy=False)
+        if len(table) == 0:
+            return
+        self._sync()
+        n = self._nconn
+        ncols = self._table.shape[1] if n > 0 else table.shape[1]
+        if ncols != table.shape[1]:
+            warn('Connection cannot be merged. Ignoring probability')
+            # NOTE: Assuming the only missing dimension is probability
+            ncols = min(ncols, table.shape[1])
+            table = table[:, :ncols]
+        if self._table.shape[1] != ncols or len(self._table) < n + len(table):
+            buf = np.empty([max(n + len(table), 2 * n), ncols], 'uint32')
+            if n > 0:
+                buf[:n] = self._table[:n, :ncols]
+            self._table = buf
+        self._table[n:n + len(table)] = table
+        self._nconn = n + len(table)
+        if self._list is not None:
+            # Keep the list handed out by the mapping property up to date
+            list.extend(self._list, table.tolist())
+        self._changed()
+
+    def _changed(self):
+        self.version += 1
+        self.dirty = True
+
+    def remove_duplicates(self):
+        """
+        Removes duplicate connections from the mapping table, keeping the first
+        occurrence of each.
+        """
+        table = self.mapping_array()
+        if len(table) < 2:
+            return
+        self.mapping = table[_group_rows(table)[1] == 0]
+
+    def merge(self, pyncs_mapping, unique=False):
+        """
+        Merge the existing mapping with a given one: the connections of
+        pyncs_mapping are appended to the mapping table.
+        If unique is True, duplicate connections are removed after merging.
+        When merging many mappings, it is cheaper to call remove_duplicates
+        once at the end.
+        """
+        self.extend(pyncs_mapping.mapping_array())
+        if unique:
+            self.remove_duplicates()
 
     def connect(self, groupsrc, groupdst, expand=True, fashion='one2one', fashion_kwargs={}, connection_kwargs={}, check=True):
         """
@@ -133,36 +311,34 @@ class Mapping(object):
                                                    **fashion_kwargs)
 
         #... and the following function creates a list of physical addresses
-        self.mapping += self.connlist_to_mapping(groupsrc, groupdst, connlist, connection_kwargs)
+        self.extend(self.connlist_to_mapping(groupsrc, groupdst, connlist, connection_kwargs))
 
-        return self.mapping
+        return self.mapping_array()
         
 
-    def connlist_to_mapping(self, groupsrc, groupdst, connlist, connect_kwargs):
+    def connlist_to_mapping(self, groupsrc, groupdst, connlist, connect_kwargs={}):
         '''
-        Creates a list of connections of physical addresses given the list of indexes in connlist.
+        Creates a table of connections of physical addresses given the table of
+        indexes in connlist. Any column of connlist after the second one (e.g.
+        the probability) is copied to the table.
+        connect_kwargs sets fields of the destination addresses, either to a
+        value or to one value per connection, e.g. {'syntype': 2}.
         '''
         if len(connlist)>0:
-            self.groupsrc = groupsrc.__copy__()[np.array(connlist)[:,0]]
-            self.groupdst = groupdst.__copy__()[np.array(connlist)[:,1]]
+            connlist = self.complete(np.asarray(connlist))
+            self.groupsrc = groupsrc.__copy__()[connlist[:,0]]
+            self.groupdst = groupdst.__copy__()[connlist[:,1]]
 
             if connect_kwargs:
                 for k,v in connect_kwargs.iteritems():
-                    field_idx = self.groupdst.addrspec.addrDict[k]
-                    #Slow, consider vectorizing
-                    if not hasattr(v, '__len__'):
-                        v = [v]*len(self.groupdst.addr)
-                    for i, a in enumerate(self.groupdst.addr):
-                        a[field_idx] = v[i]
-                        self.groupdst.addr[i] = a
-                    self.groupdst.repopulate()
-
-            return np.column_stack([self.groupsrc.paddr,self.groupdst.paddr]).tolist()
+                    self.groupdst.addr[k] = v
+                self.groupdst.repopulate()
+
+            return np.column_stack([self.groupsrc.paddr, self.groupdst.paddr,
+                                    connlist[:,2:]])
         else:
             return []
 
-        
-
     def __connect_all2all__(self, groupsrc, groupdst):
         """
         Connect groups in an all to all fashion.
@@ -178,22 +354,37 @@ class Mapping(object):
 
         if len(groupsrc) != len(groupdst):
             print("WARNING: source and destination have different sizes")
-            if len(groupdst) > len(groupsrc):
-                groupdst = groupdst[:len(groupsrc)]
-            else:
-                groupsrc = groupsrc[:len(groupdst)]
-        connect_dist = np.eye(len(groupsrc))*p
-        return self.__connect_by_probability_matrix__(groupsrc, groupdst, connect_dist)
+        n = min(len(groupsrc), len(groupdst))
+        return self._connect_pairs(groupsrc, groupdst,
+                                   np.arange(n), np.arange(n), p)
 
     def __connect_random_all2all__(self, groupsrc, groupdst, p=0.25):
         """
         Connects in an all to all fashion with probability p for every
         connection, from the first of the source to the last of the source.
         """
-
-        connect_dist = np.ones([len(groupsrc), len(groupdst)]) * p
-
-        return self.__connect_by_probability_matrix__(groupsrc, groupdst, connect_dist)
+        nsrc, ndst = len(groupsrc), len(groupdst)
+        if hasattr(p, '__len__'):
+            connect_dist = np.ones([nsrc, ndst]) * p
+            return self.__connect_by_probability_matrix__(groupsrc, groupdst, connect_dist)
+
+        # Draw the number of connections, then which ones
+        n = np.random.binomial(nsrc * ndst, p)
+        idx = _sample_indices(nsrc * ndst, n)
+        return self._connect_pairs(groupsrc, groupdst,
+                                   idx // ndst, idx % ndst)
+
+    def _connect_pairs(self, groupsrc, groupdst, isrc, idst, p=1.0):
+        '''
+        Connects groupsrc[isrc[k]] to groupdst[idst[k]] for every k, each with
+        probability p (a scalar or one value per pair). Returns an array of
+        connections.
+        '''
+        if not np.isscalar(p) or p < 1:
+            keep = np.random.rand(len(isrc)) < p
+            isrc, idst = isrc[keep], idst[keep]
+        return np.column_stack([np.asarray(groupsrc)[isrc],
+                                np.asarray(groupdst)[idst]])
 
     def __connect_by_boolean_matrix__(self, groupsrc, groupdst, connection):
         '''
@@ -201,16 +392,8 @@ class Mapping(object):
         groupdst: destination group
         connection: matrix of connections
         '''
-
-
-        pairs_all = np.array(np.meshgrid(groupsrc, groupdst)).transpose()
-        connection = np.array(connection, 'bool')
-        pairs_selected = pairs_all[connection]
-
-        c1 = pairs_selected[:, 0]
-        c2 = pairs_selected[:, 1]
-
-        return np.column_stack([c1, c2]).tolist()
+        isrc, idst = np.nonzero(np.array(connection, 'bool'))
+        return self._connect_pairs(groupsrc, groupdst, isrc, idst)
 
     def __connect_by_probability_matrix__(self, groupsrc, groupdst, M, return_inst = False):
 
@@ -245,38 +428,31 @@ class Mapping(object):
         i.e. creates a matrix M such that P(M_{src,tgt}==1) = p[tgt] with src=1, ..., Nsrc and tgt=1, ... ,Ntgt
         """
 
+        nsrc, ndst = len(groupsrc), len(groupdst)
         if not hasattr(p, '__len__'):
-            p = p * np.ones(len(groupdst))
-
-        N = [p[i] * len(groupsrc) for i in range(len(groupdst))]
-        connect_inst = np.zeros([len(groupsrc), len(groupdst)]).astype('bool')
+            p = p * np.ones(ndst)
 
         # It is important to know that p is intepreted as the probability to
         # connect to the target, not that the source connects to any target
         #i.e. M such that P(M_{src,tgt}==1) = p[tgt]
 
-        #Create N[i] for each source i...
-        for i in range(len(groupdst)):
-            #Separate integer and factional parts
-            frac, integ = np.modf(N[i])
-            connect_inst[:integ, i] = True
-            # Deal with fractional part by rolling a dice and checking not to
-            # overrun
-            if np.random.rand() < frac and integ + 1 < len(groupsrc):
-                connect_inst[integ + 1, i] = True
-
-        #... and shuffle them
-        for i in range(connect_inst.shape[1]):
-            np.random.shuffle(connect_inst[:, i])
+        #Draw N[i] sources for each target i: separate integer and fractional
+        #parts and deal with the fractional part by rolling a dice, checking
+        #not to overrun
+        frac, integ = np.modf(np.asarray(p[:ndst], 'float') * nsrc)
+        N = integ.astype('int') + (np.random.rand(ndst) < frac)
+        N = np.minimum(N, nsrc)
 
-        #TODO: go through binary matrix
-
-        return self.__connect_by_boolean_matrix__(groupsrc, groupdst, connect_inst)
+        isrc = np.concatenate([np.zeros(0, 'int')] +
+                              [_sample_indices(nsrc, n) for n in N])
+        idst = np.repeat(np.arange(ndst), N)
+        order = np.lexsort([idst, isrc])
+        return self._connect_pairs(groupsrc, groupdst, isrc[order], idst[order])
 
 
     def clear(self):
         """
-        Clear mapping list.
+        Clear mapping table.
         """
         self.mapping = []
 
@@ -285,15 +461,14 @@ class Mapping(object):
         """
         Save the mapping into a file.
         """
-        np.savetxt(filename, self.mapping)
+        np.savetxt(filename, self.mapping_array())
 
 
     def load(self, filename, verbose=False):
         """
         Loads the mapping from a file.
         """
-        self.clear()
-        self.mapping = np.loadtxt(filename)        
+        self.mapping = np.loadtxt(filename, ndmin=2)
 
 
     def is_connect_possible(self, groupsrc, groupdst):
@@ -308,8 +483,60 @@ class Mapping(object):
         '''
         Run any functions before applying the mapping table
         '''
-        self.__toint__()
-        
+        # Only needed if the list of connections was modified
+        self._sync()
+
+
+    def diff(self, table):
+        '''
+        Returns the connections (added, removed) that turn table into the
+        mapping table. Duplicate connections are counted.
+        '''
+        table = self._as_table(table, copy=False)
+        mapping = self.mapping_array()
+        if len(table) == 0 or len(mapping) == 0 or \
+                table.shape[1] != mapping.shape[1]:
+            return mapping, table
+        if len(mapping) >= len(table) and \
+                np.array_equal(mapping[:len(table)], table):
+            # Connections were only appended
+            return mapping[len(table):], mapping[:0]
+        # Pair equal rows of the two tables, counting duplicates. Among equal
+        # rows, those of the mapping table come first.
+        n = len(mapping)
+        ids, occ = _group_rows(np.concatenate([mapping, table]))
+        count_m = np.bincount(ids[:n], minlength=len(ids))
+        count_t = np.bincount(ids[n:], minlength=len(ids))
+        return (mapping[occ[:n] >= count_t[ids[:n]]],
+                table[occ[n:] - count_m[ids[n:]] >= count_m[ids[n:]]])
+
+    def upload(self, mapper):
+        '''
+        Uploads the mapping table to mapper (a MappingsBase instance). If the
+        mapper still holds the table of the last upload (of any Mapping), only
+        the connections that changed are sent with mapper.remove_mappings and
+        mapper.add_mappings, if the mapper implements them. Otherwise the whole
+        table is sent with mapper.set_mappings.
+        '''
+        last_table = getattr(mapper, '_uploaded_table', None)
+        table = self.mapping_array()
+        if last_table is None or last_table.shape[1] != table.shape[1]:
+            if len(table) > 0:
+                mapper.set_mappings(table)
+            else:
+                mapper.clear_mappings()
+        else:
+            added, removed = self.diff(last_table)
+            try:
+                if len(removed) > 0:
+                    mapper.remove_mappings(removed)
+                if len(added) > 0:
+                    mapper.add_mappings(added)
+            except NotImplementedError:
+                mapper.set_mappings(table)
+        if hasattr(mapper, '_uploaded_table'):
+            mapper._uploaded_table = table.copy()
+
     def write(self, *args, **kwargs):
         warn("Mappings.write has no effect. Use NeuroSetupBase.run or NeuroSetupBase.prepare instead")
 
@@ -321,8 +548,8 @@ class Mapping(object):
         Output:
         evetns with mapped Physical addresses
         '''
-        map_dict = self.mapping_dict()
-        return events.filter_by_mapping(map_dict)
+        events.filter_by_mapping(self.mapping_csr())
+        return events
 
     def mapping_dict(self):
         '''
@@ -332,9 +559,29 @@ class Mapping(object):
         from collections import defaultdict
         mapping_dict = defaultdict(list)
         func = lambda srctgt: mapping_dict[srctgt[0]].append(srctgt[1])
-        map(func, self.mapping)
+        map(func, self.mapping_array())
         return mapping_dict
 
+    def mapping_csr(self):
+        '''
+        Returns the mapping table in compressed sparse row format: a tuple (sources, offsets, targets) where sources is sorted and the targets of sources[i] are targets[offsets[i]:offsets[i+1]], in the order of the mapping table
+        The arrays are read-only: they are cached until the version of the mapping changes.
+        '''
+        table = self.mapping_array()
+        version, csr = self._csr
+        if version == self.version:
+            return csr
+        order = np.argsort(table[:, 0], kind='mergesort')
+        src = table[order, 0]
+        targets = table[order, 1]
+        sources, counts = np.unique(src, return_counts=True)
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype('int')
+        csr = (sources, offsets, targets)
+        for a in csr:
+            a.setflags(write=False)
+        self._csr = (self.version, csr)
+        return csr
+
 
 class PMapping(Mapping):
     """
@@ -351,54 +598,46 @@ class PMapping(Mapping):
         M : connection matrix, where each entry is the transmission probability
         '''
 
-        #Create pairs of source - destinations and reshape as appropiately
-        pairs = np.array(np.meshgrid(groupsrc, groupdst)).transpose().reshape(-1, 2)
-
-        p = np.column_stack([pairs, M.flatten()])
+        M = np.asarray(M)
+        isrc, idst = np.nonzero(M)
+        return self._connect_pairs(groupsrc, groupdst, isrc, idst, M[isrc, idst])
 
+    def __connect_random_all2all__(self, groupsrc, groupdst, p=0.25):
+        '''
+        Connects every source to every target, with transmission probability p
+        '''
+        nsrc, ndst = len(groupsrc), len(groupdst)
+        isrc = np.repeat(np.arange(nsrc), ndst)
+        idst = np.tile(np.arange(ndst), nsrc)
+        if hasattr(p, '__len__'):
+            p = (np.ones([nsrc, ndst]) * p).flatten()
+        return self._connect_pairs(groupsrc, groupdst, isrc, idst, p)
+
+    def _connect_pairs(self, groupsrc, groupdst, isrc, idst, p=1.0):
+        '''
+        Connects groupsrc[isrc[k]] to groupdst[idst[k]] for every k with
+        transmission probability p (a scalar or one value per pair). Returns an
+        array of connections, dropping those with zero probability.
+        '''
         # Transform p. Somehow this is not the best place to do this since it
         # assumes already the discretization due to the mapper firmware
-        p[:, 2] = np.array(p[:, 2] * self.max_p, 'uint32')
+        p = np.array(np.ones(len(isrc)) * p * self.max_p, 'uint32')
 
         #Remove all zero probabilities
-        zp = p[:, 2] != 0
-        p_nonzero = p[zp, :].astype('uint32').tolist()
-
-        return p_nonzero
-
-
-    def connlist_to_mapping(self, groupsrc, groupdst, connlist, connect_kwargs={}):
-        '''
-        Creates a list of connections of physical addresses given the list of indexes in connlist.
-        '''
-        if len(connlist)>0:
-            self.groupsrc = groupsrc.__copy__()[np.array(connlist)[:,0]]
-            self.groupdst = groupdst.__copy__()[np.array(connlist)[:,1]]
-
-            connlist = self.complete(connlist)
+        zp = p != 0
+        return np.column_stack([np.asarray(groupsrc)[isrc[zp]],
+                                np.asarray(groupdst)[idst[zp]],
+                                p[zp]])
 
-            if connect_kwargs:
-                for k,v in connect_kwargs.iteritems():
-                    field_idx = self.groupdst.addrspec.addrDict[k]
-                    #Slow, consider vectorizing
-                    if not hasattr(v, '__len__'):
-                        v = [v]*len(self.groupdst.addr)
-                    for i, a in enumerate(self.groupdst.addr):
-                        a[field_idx] = v[i]
-                        self.groupdst.addr[i] = a
-                    self.groupdst.repopulate()
-
-            return np.column_stack([self.groupsrc.paddr,self.groupdst.paddr,np.array(connlist)[:,2]]).tolist()
-        else:
-            return []
 
     def complete(self, connlist):
         '''
         For all connections without a probability, assume the probability is one
         '''
-        for c in connlist:
-            if len(c) == 2:
-                c.append(self.max_p)
+        connlist = np.asarray(connlist)
+        if connlist.ndim == 2 and connlist.shape[1] == 2:
+            connlist = np.column_stack([connlist,
+                                        np.repeat(self.max_p, len(connlist))])
         return connlist
 
 
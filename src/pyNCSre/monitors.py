@@ -11,6 +11,7 @@ import numpy as np
 import pylab
 from collections import defaultdict
 from .pyST.STsl import mapSpikeListAddresses, composite_plot, SpikeList, SpikeTrain, merge_spikelists
+from .pyST.spikes import emptySpikeTrain
 import copy
 
 def create_SpikeMonitor_from_SpikeList(st):
@@ -20,7 +21,7 @@ def create_SpikeMonitor_from_SpikeList(st):
     from pyNCS import AddrGroupBase
     msl = monitorSpikeList(0, st)
     a = AddrGroupBase('')
-    a.paddr = a.laddr = a.addr = st.id_list()
+    a.paddr = a.laddr = a.addr = st.id_list().copy()
     a.channel = 0
     sm = SpikeMonitor(addr_group = a)
     sm.populate(msl)
@@ -87,15 +88,19 @@ class Monitors(object):
             if not m.sl.t_stop > t_stop:
                 m.sl.t_stop = t_stop
 
-    def populate(self, chstlist):
+    def populate(self, chstlist, append=False, history=None):
         """
         Populates SpikeMonitors in the list of monitors
         chstlist is the dictionary returned by NeuroSetup.stimulate.
         (this is also the object that channelAddressing.rawoutput_from_chevents returns (a RawOutput object)
+        If *append* is True, the events are appended to the SpikeMonitors instead (see SpikeMonitor.append, *history* is passed to it).
 
         """
         for mon, st in self.iterchst(chstlist):
-            mon.populate(st)
+            if append:
+                mon.append(st, history=history)
+            else:
+                mon.populate(st)
 
     def populate_monitors(self, chstlist):
         '''
@@ -510,6 +515,54 @@ class SpikeMonitor(object):
         self._data = st
         self._populated = False
 
+    def append(self, st, history=None):
+        """
+        Appends the monitered events of SpikeList *st* to the ones of the SpikeMonitor, e.g. packet by packet when monitoring continuously (see NeuroSetup.stream).
+        Only the SpikeTrains of the addresses present in *st* are extended, the rest of the SpikeList is left untouched.
+        If *history* is given, only the events of the last *history* ms are kept, such that the memory used by the SpikeMonitor remains bounded.
+        """
+        sl = self.sl
+        adtm = np.fliplr(st.raw_data()).reshape(-1, 2)
+        adtm = adtm[np.in1d(adtm[:, 0], self.addr_group.laddr)]
+        if len(adtm) > 0:
+            adtm = adtm[np.lexsort((adtm[:, 1], adtm[:, 0]))]
+            ids, starts = np.unique(adtm[:, 0], return_index=True)
+            for id, times in zip(ids, np.split(adtm[:, 1], starts[1:])):
+                if id in sl.spiketrains and len(sl.spiketrains[id]) > 0:
+                    spike_times = sl.spiketrains[id].spike_times
+                    if times[0] >= spike_times[-1]:
+                        times = np.concatenate([spike_times, times])
+                    else:
+                        times = np.sort(np.concatenate([spike_times, times]))
+                sl[id] = SpikeTrain(times, presorted=True)
+
+        t_first, t_last = [], []
+        for id, spiketrain in sl.spiketrains.items():
+            spike_times = spiketrain.spike_times
+            if len(spike_times) > 0:
+                t_first.append(spike_times[0])
+                t_last.append(spike_times[-1])
+        if len(t_last) == 0:
+            return
+
+        t_last = max(t_last)
+        if history is not None and min(t_first) < t_last - history:
+            t_min = t_last - history
+            t_first = []
+            for id, spiketrain in sl.spiketrains.items():
+                spike_times = spiketrain.spike_times
+                if len(spike_times) == 0 or spike_times[0] >= t_min:
+                    if len(spike_times) > 0:
+                        t_first.append(spike_times[0])
+                    continue
+                spike_times = spike_times[spike_times.searchsorted(t_min):]
+                if len(spike_times) > 0:
+                    sl[id] = SpikeTrain(spike_times.copy(), presorted=True)
+                    t_first.append(spike_times[0])
+                else:
+                    sl.spiketrains[id] = emptySpikeTrain()
+        sl.t_start, sl.t_stop = min(t_first), t_last
+
     def _do_populate(self):
         assert hasattr(self, '_data'), "SpikeMonitor must be populated first"
         self._populated = True
@@ -570,7 +623,12 @@ class SpikeMonitor(object):
         """
         Transform SpikeList *st* into a monitorSpikeList object
         """
-        adtm = np.fliplr(st.raw_data())
+        return self.adtm_to_monitorSpikeList(np.fliplr(st.raw_data()))
+
+    def adtm_to_monitorSpikeList(self, adtm):
+        """
+        Transform an array of events in (address, time) format into a monitorSpikeList object
+        """
         if adtm.shape[0] == 0:
             return monitorSpikeList(channel=None, spikes=[], id_list=[])
         t_start, t_stop = min(adtm[:, 1]), max(adtm[:, 1])
@@ -607,9 +665,8 @@ class monitorSpikeList(SpikeList):
         mapping=dictionary containing address mapping
         '''
         mapped_SL = monitorSpikeList(self.channel, spikes=[], id_list=[])
-        addr_SL = self.id_list()
         for k, v in mapping.iteritems():
-            if k in addr_SL:
+            if k in self.spiketrains:
                 try:
                     mapped_SL[v] = self[k]
                 except KeyError:
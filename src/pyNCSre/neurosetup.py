@@ -244,6 +244,7 @@ class NeuroSetup(object):
         #Load Mapper
         # load a virtual mapping table by defauld
         self.mapping = Mapping('Virtual Mapping') 
+        self._prepared_mapping = (None, None)
 
         for nmapper in nsetup.iterfind('mapper'):
             map_kwargs = xml_parse_parameter(nmapper)
@@ -356,10 +357,20 @@ class NeuroSetup(object):
             chip.configurator.reset()
 
     def prepare(self):
+        '''
+        Prepares the mapping table and uploads it to the mapper. Nothing is
+        done if the mapping table did not change since the last call: set
+        self.mapping.dirty to True to force it.
+        '''
+        mapping, version = self._prepared_mapping
+        if mapping is self.mapping and version == self.mapping.version \
+                and not self.mapping.dirty:
+            return
         self.mapping.prepare()
         if not self.offline:
-            if len(self.mapping.mapping) > 0:
-                self.mapper.set_mappings(self.mapping.mapping)
+            self.mapping.upload(self.mapper)
+        self.mapping.dirty = False
+        self._prepared_mapping = (self.mapping, self.mapping.version)
 
     def __copy__(self):
         return self.__class__(self.setupfile,
@@ -396,7 +407,7 @@ class NeuroSetup(object):
         evs = self.mapper.filter_events(evs_in)
         return evs.get_adtmev()
 
-    def _post_process(self, evs, filter_channels=None):
+    def _post_process(self, evs, filter_channels=None, append=False, history=None):
         evs_out = pyST.events(evs, 'p')
         mon_ch_addr = self.mon
         #extract per channel events -> ch_events
@@ -410,7 +421,11 @@ class NeuroSetup(object):
             normalize=False,
             filter_duplicates=False
             )
-        self.monitors.populate_monitors(chstlist=stout)
+        if stout.n_workers > 1:
+            #Decode all the channels of stout concurrently (only those in
+            #filter_channels if it is given)
+            stout.decode_all_channels()
+        self.monitors.populate(chstlist=stout, append=append, history=history)
         return stout
 
     def run(self, *args, **kwargs):
@@ -424,6 +439,27 @@ class NeuroSetup(object):
         else:
             return np.zeros([0,2],dtype='uint32')
 
+    def stream(self, duration=None, n_packets=None, history=10000., **kwargs):
+        '''
+        Monitors continuously, one event packet at a time (requires a Communicator with a mon() method, see ContinuousCommunicatorBase).
+        Generator: every packet returned by communicator.mon() is extracted, decoded and appended to the monitors (see SpikeMonitor.append), and its Stas.RawOutput object is yielded.
+        Only the current packet is held in memory, the monitors keep the events of the last *history* ms (all of them if *history* is None, in which case their memory grows with the duration of the stream).
+        *duration*: passed to communicator.mon()
+        *n_packets*: number of packets to monitor. If None, monitors until the generator is closed.
+        *kwargs* are keyword arguments passed to self.communicator.mon()
+
+        >>> for out in nsetup.stream(duration=500, history=10000):
+        ...     print stmon.sl.mean_rate()
+        '''
+        if not hasattr(self.communicator, 'mon'):
+            raise TypeError("Streaming requires a Communicator with a mon() method (see ContinuousCommunicatorBase)")
+        n = 0
+        while n_packets is None or n < n_packets:
+            evs = self.communicator.mon(duration, **kwargs)
+            n += 1
+            yield self._post_process(evs, self.monitors.channels,
+                                     append=True, history=history)
+
     def stimulate_raw(self, raw_stim, **kwargs):
         '''
         Calls communicator.run without pre- or post-processing
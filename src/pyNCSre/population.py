@@ -9,48 +9,11 @@
 from __future__ import absolute_import
 import numpy as np
 import copy
-import itertools as it
 from pickle import dump, load
 
 from .group import AddrGroup
 
 
-def _buildGrid(inlist):
-    '''
-    Builds a multidimensional grid from input lists.
-    (tip: operate on indexes, not values)
-    Ex:
-    >>> _buildGrid([[0,1],[0,2,3]])
-    >>> array([[0, 0],
-               [0, 2],
-               [0, 3],
-               [1, 0],
-               [1, 2],
-               [1, 3]])
-    Sadique: Isn't this is the same as
-    np.array(list(it.product(*inlist))) ??
-    '''
-    nD = len(inlist)
-    min_list = [0] * nD
-    max_list = [None] * nD
-    for i in range(nD):
-        max_list[i] = len(inlist[i])
-    strmgrid = 'np.mgrid['
-    for fieldIdx in xrange(nD):
-        strmgrid = strmgrid + '{0}:{1},'.format(
-            min_list[fieldIdx], max_list[fieldIdx])
-    strmgrid = strmgrid + ']'
-    allpo = eval(strmgrid)
-    tot = np.prod(allpo[0].shape)
-    grid = np.zeros([tot, len(allpo)], dtype=type(min_list[0]))
-    grid_values = np.zeros_like(grid)
-    for j in range(len(allpo)):
-        grid[:, j] = allpo[j].flatten()
-    for i in range(nD):
-        grid_values[:, i] = np.array(inlist[i])[grid[:, i]]
-    return grid_values
-
-
 # TODO: Population.soma[0] should give the (Human) address
 class Population(object):
     """
@@ -265,36 +228,15 @@ class Population(object):
         NOTE: The returned array preserves ordering of neurons (np.repeat)
         """
 
-        somaaddr = addresses
         dtp = AddrGroup._get_dtype(AddrGroup('',''), self.setup, self.soma.chipid, 'in')
-        syn_dim_names = None
-        synaddrs_all = None
-        for s in synapses:
-            syn_block = self.neuronblock.synapses[s]
-            if syn_dim_names == None:
-                syn_dim_names = syn_block.dims.keys()
-                syndtp = np.dtype([(str(k), 'uint32') for k in syn_dim_names])
-                # NOTE: the str type cast is because numpy dtype doesn't support
-                # unicode strings
-            synaddrs = [syn_block.dims[fld] for fld in syn_dim_names]
-            synaddrs = list(it.product(*synaddrs))
-            if synaddrs_all == None:
-                synaddrs_all = np.array(synaddrs)
-            else:
-                synaddrs_all = np.concatenate((synaddrs_all, synaddrs))
-        # Syn addresses only
-        synaddrs_all = synaddrs_all.astype('uint32').view(syndtp).T[0]
-        # Syn addresses tiled for all soma addresses
-        synaddrs_full = np.tile(synaddrs_all, len(addresses)) 
-        # Soma addresses repeated for all synapse addresses
-        soma_addr_all = addresses.repeat(len(synaddrs_all))
-        # Full addresses space
-        syn_addr_full = np.zeros(soma_addr_all.shape, dtype=dtp)
-        for fld in soma_addr_all.dtype.names:
-            syn_addr_full[fld] = soma_addr_all[fld]
-        for fld in synaddrs_all.dtype.names:
-            syn_addr_full[fld] = synaddrs_full[fld]
-        return syn_addr_full
+        synaddrs = self.neuronblock.synapse_grid(synapses)
+        # Soma addresses along the rows, synapse addresses along the columns
+        syn_addr_full = np.zeros((len(addresses), len(synaddrs)), dtype=dtp)
+        for fld in addresses.dtype.names:
+            syn_addr_full[fld] = addresses[fld][:, None]
+        for fld in synaddrs.dtype.names:
+            syn_addr_full[fld] = synaddrs[fld]
+        return syn_addr_full.ravel()
 
     def __populate_init__(self, setup, chipid, neurontype):
         """
@@ -344,7 +286,8 @@ class Population(object):
             S.populate_line(self.setup,
                     self.soma.chipid,
                     grouptype='in',
-                    addresses=addresses,)
+                    addresses=addresses,
+                    trusted=self.soma._trusted())
 
     def populate_all(self, setup, chipid, neurontype):
         """
@@ -355,7 +298,7 @@ class Population(object):
         # filter addresses from the ones available in neuronblock
         addresses = self.neuronblock.soma.addresses
         self.soma.populate_line(setup, chipid, grouptype='out',
-                                addresses=addresses)
+                                addresses=addresses, trusted=True)
 
         self.__populate_synapses__()
 
@@ -379,7 +322,7 @@ class Population(object):
         if len(addresses) != n:
             raise Exception("Not enough neurons of this type.")
         self.soma.populate_line(setup, chipid, grouptype='out',
-                                addresses=addresses)
+                                addresses=addresses, trusted=True)
 
         self.__populate_synapses__()
 
@@ -401,7 +344,7 @@ class Population(object):
         addresses = a[np.random.random(len(a)) < p]
 
         self.soma.populate_line(setup, chipid, grouptype='out',
-                                addresses=addresses)
+                                addresses=addresses, trusted=True)
 
         self.__populate_synapses__()
 
@@ -423,7 +366,7 @@ class Population(object):
              grouptype='out', **topology_kwargs)
         addresses = _set_intersection(S.addr, self.neuronblock.soma.addresses)
         self.soma.populate_line(
-            setup, chipid, grouptype='out', addresses=addresses)
+            setup, chipid, grouptype='out', addresses=addresses, trusted=True)
         self.__populate_synapses__()
 
 #    def populate_by_dimension(self, setup, chipid, neurontype, filt_list = [[-1],[-1],[-1]]:
@@ -515,7 +458,8 @@ class Population(object):
         addresses = self.neuronblock.soma.addresses[np.prod(mask, axis=1, dtype='bool')]
         try:
             self.soma.populate_line(
-                setup, chipid, grouptype='out', addresses=addresses)
+                setup, chipid, grouptype='out', addresses=addresses,
+                trusted=True)
         except:
             raise Exception(("Chip {0} contains no neurons of given" +
                             "id_list on axes {1}.").format(chipid, axes))
@@ -16,15 +16,31 @@ import os
 import copy
 import time
 import warnings
+import json
 from . STsl import *
 import itertools
 from contextlib import contextmanager
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
 from . import pyST_globals
 from lxml import etree
 
 
 PERFORMANCE_DEBUG=False
 
+#Dense address lookup tables (see addrBuildLUT) are only built for address
+#specifications whose physical and logical addresses fit in LUT_MAX_BITS bits
+LUT_MAX_BITS = 20
+LUT_INVALID = np.uint32(2**32-1)
+#Maximum number of elements of the grids memoized by _buildGrid
+GRID_CACHE_SIZE = 2**24
+#Default number of threads used by RawOutput to decode channels concurrently
+#(1: channels are decoded serially)
+DECODE_WORKERS = 1
+#Above this number of channels present in a packet, channelAddressing.extract
+#groups the events by sorting them instead of scanning them once per channel
+DEMUX_MAX_SCAN = 64
+
 #TODO: RawOutput should return spikelists with complete id_list even when empy
 class RawOutput(object):
     '''
@@ -39,6 +55,8 @@ class RawOutput(object):
     *t_start*: start time of all spikelists in ms
     *t_stop*: end time of all spikelists in ms
     *filter_duplicates*: If True erases in all channels double events within the a 0.01ms time-frame (buggy hw)
+    *window_cache_size*: Number of decoded windows (see window) which are cached
+    *n_workers*: Number of threads used by decode_all_channels to decode the channels concurrently (default: DECODE_WORKERS)
 
     Usage:
     #In conjunction with pyAex.netClient
@@ -47,16 +65,24 @@ class RawOutput(object):
     >>> raw_out = client.stimulate()
     >>> client.stop()
     >>> for sl in raw_output: sl.raster_plot()
+    >>> sl = raw_output.window(1, 200, 400) #Decodes only 200ms of channel 1
     '''
-    def __init__(self, raw_data, decoder_dict, t_start=0, t_stop=1000, filter_duplicates=False):
+    def __init__(self, raw_data, decoder_dict, t_start=0, t_stop=1000, filter_duplicates=False, window_cache_size=32, n_workers=None):
 
         #Inputs
         self.raw_data = raw_data.copy()
         self.decoder_dict = decoder_dict
         self.filter_duplicates = filter_duplicates
+        self.window_cache_size = window_cache_size
+        if n_workers is None:
+            n_workers = DECODE_WORKERS
+        self.n_workers = n_workers
 
         #Containers
         self.decoded_data = {}
+        self.window_cache = OrderedDict()
+        self._raw_sorted = {}
+        self._raw_ids = {}
         self.channels = self.raw_data.keys()
         self.t_start = t_start
         self.t_stop = t_stop
@@ -79,36 +105,143 @@ class RawOutput(object):
         self.decode_all_channels()
         dc = self.__dict__.copy()
         del dc['decoder_dict']
+        dc['window_cache'] = OrderedDict()
         return dc
 
-    def decode_all_channels(self):
+    def decode_all_channels(self, n_workers=None):
+        """
+        Decodes all the channels. If n_workers (default: self.n_workers) is larger than 1, the channels are decoded concurrently by a pool of n_workers threads.
+        """
+        if n_workers is None:
+            n_workers = self.n_workers
+        keys = [k for k in self.channels if k in self.raw_data]
+        if n_workers > 1 and len(keys) > 1:
+            pool = ThreadPool(min(n_workers, len(keys)))
+            try:
+                decoded = pool.map(self._decode_channel, keys)
+            finally:
+                pool.close()
+            for key, st_data in zip(keys, decoded):
+                self.raw_data.pop(key)
+                self.decoded_data[key] = st_data
+
         for i in self.channels:
-            self.decode_data(i)
+            if not i in self.decoded_data:
+                self.decode_data(i)
 
     def decode_data(self, key):
         with self.check_has_key_somewhere(key):
-            if PERFORMANCE_DEBUG: t0=time.time()
-            ad_data = self.decoder_dict[key](self.raw_data[key].get_ad())
-            tm_data = self.raw_data[key].get_tm().astype('float') / 1000
-            if PERFORMANCE_DEBUG:
-                print('Decoding events took {0} seconds'.format(time.time()-t0))
-
-            if PERFORMANCE_DEBUG: t0=time.time()
-            evs = events(atype='l')
-            evs.add_adtm(ad_data, tm_data)
-            if PERFORMANCE_DEBUG:
-                print('Building events took {0} seconds'.format(time.time()-t0))
-
-            if PERFORMANCE_DEBUG: t0=time.time()
-            st_data = SpikeList( evs.get_adtmev(), np.unique(evs.get_ad()))
-            if PERFORMANCE_DEBUG:
-                print('Building SpikeList took {0} seconds'.format(time.time()-t0))
-
-            if self.filter_duplicates:
-                st_data.filter_duplicates()
+            st_data = self._decode_channel(key)
             self.raw_data.pop(key)
             self.decoded_data[key] = st_data
 
+    def _decode_channel(self, key):
+        """
+        Decodes the raw events of channel *key* and returns them as a SpikeList. Does not modify the RawOutput, so that channels can be decoded concurrently.
+        """
+        if PERFORMANCE_DEBUG: t0=time.time()
+        ad_data = self.decoder_dict[key](self.raw_data[key].get_ad())
+        tm_data = self.raw_data[key].get_tm().astype('float') / 1000
+        if PERFORMANCE_DEBUG:
+            print('Decoding events took {0} seconds'.format(time.time()-t0))
+
+        if PERFORMANCE_DEBUG: t0=time.time()
+        evs = events(atype='l')
+        evs.add_adtm(ad_data, tm_data)
+        if PERFORMANCE_DEBUG:
+            print('Building events took {0} seconds'.format(time.time()-t0))
+
+        if PERFORMANCE_DEBUG: t0=time.time()
+        st_data = ColumnarSpikeList(evs.get_adtmev(), np.unique(evs.get_ad()))
+        if PERFORMANCE_DEBUG:
+            print('Building SpikeList took {0} seconds'.format(time.time()-t0))
+
+        if self.filter_duplicates:
+            st_data.filter_duplicates()
+        return st_data
+
+    def window(self, key, t_start=None, t_stop=None, ids=None):
+        """
+        Returns a SpikeList of the events of channel *key* between t_start and t_stop (in ms, both included as in SpikeList.time_slice), optionally restricted to the (logical) addresses *ids*.
+        Until the channel is decoded (see decode_data), only the events of the window are decoded: they are found by binary search in the raw timestamps.
+        The last window_cache_size windows are cached: the returned SpikeLists should not be modified in place.
+        """
+        key = int(key)
+        if ids is not None:
+            ids = np.unique(ids)
+            cache_key = (key, t_start, t_stop, tuple(ids))
+        else:
+            cache_key = (key, t_start, t_stop, None)
+        if cache_key in self.window_cache:
+            st_data = self.window_cache.pop(cache_key)
+            self.window_cache[cache_key] = st_data
+            return st_data
+
+        if key in self.raw_data:
+            ad_data, tm_data = self._decode_window(key, t_start, t_stop)
+        elif key in self.decoded_data:
+            st = self.decoded_data[key]
+            offsets, tm_data = st._flat()[:2]
+            ad_data = np.repeat(st.id_list(), np.diff(offsets))
+        else:
+            if not key in self.decoder_dict:
+                raise KeyError("There is no function to decode %d" % key)
+            ad_data, tm_data = np.zeros([0]), np.zeros([0])
+
+        keep = np.ones(len(tm_data), 'bool')
+        if t_start is not None:
+            keep &= tm_data >= t_start
+        if t_stop is not None:
+            keep &= tm_data <= t_stop
+        if ids is not None:
+            keep &= np.in1d(ad_data, ids)
+        elif key in self.raw_data or key in self.decoded_data:
+            ids = self._channel_ids(key)
+        else:
+            ids = np.zeros([0])
+
+        st_data = ColumnarSpikeList(np.column_stack([ad_data[keep], tm_data[keep]]), ids)
+        st_data.t_start = self.t_start if t_start is None else t_start
+        st_data.t_stop = self.t_stop if t_stop is None else t_stop
+        if self.filter_duplicates:
+            st_data.filter_duplicates()
+
+        self.window_cache[cache_key] = st_data
+        while len(self.window_cache) > self.window_cache_size:
+            self.window_cache.popitem(last=False)
+        return st_data
+
+    def _channel_ids(self, key):
+        """
+        Returns the (logical) addresses of all the events of channel *key*, i.e. the id_list of the SpikeList returned by decode_data. Only the distinct raw addresses are decoded.
+        """
+        if key in self.decoded_data:
+            return self.decoded_data[key].id_list()
+        if not key in self._raw_ids:
+            raw_ad = np.unique(self.raw_data[key].get_ad())
+            self._raw_ids[key] = np.unique(self.decoder_dict[key](raw_ad))
+        return self._raw_ids[key]
+
+    def _decode_window(self, key, t_start=None, t_stop=None):
+        """
+        Decodes the raw events of channel *key* which may lie between t_start and t_stop (ms). Returns logical addresses and times (ms).
+        """
+        tm = self.raw_data[key].get_tm()
+        if not key in self._raw_sorted:
+            self._raw_sorted[key] = bool(np.all(tm[1:] >= tm[:-1]))
+        i0, i1 = 0, len(tm)
+        if self._raw_sorted[key]:
+            #Raw timestamps are in us. The exact bounds are applied on the decoded times
+            if t_start is not None:
+                i0 = np.searchsorted(tm, t_start * 1000 - 1, 'left')
+            if t_stop is not None:
+                i1 = max(i0, np.searchsorted(tm, t_stop * 1000 + 1, 'right'))
+        if i1 == i0:
+            return np.zeros([0]), np.zeros([0])
+        ad_data = self.decoder_dict[key](self.raw_data[key].get_ad()[i0:i1])
+        tm_data = tm[i0:i1].astype('float') / 1000
+        return ad_data, tm_data
+
     def iteritems(self):
         for key, value in self.iterchannels(self.channels):
             yield key, value
@@ -142,6 +275,9 @@ class RawOutput(object):
 class events(object):
     #Number of dimensions (address, timestamp)
     NF = 2
+    #Preallocated storage of the events, see reserve. The events are the
+    #first nev entries of the buffer
+    __buffer = None
 
     def __init__(self, ev=None, atype='p', isISI=False):
         self.isISI = isISI
@@ -172,6 +308,18 @@ class events(object):
         else:
             self.__data = np.zeros([0], self.dtype)
 
+    @classmethod
+    def _from_data(cls, data, atype='p', isISI=False):
+        """
+        Wraps a structured array with fields ('tm', 'ad') without copying it
+        (unless its dtype does not match *atype*).
+        """
+        ev = cls(atype=atype, isISI=isISI)
+        if data.dtype != ev.dtype:
+            data = data.astype(ev.dtype)
+        ev.__data = data
+        return ev
+
     @property
     def data(self):
         return self.__data
@@ -187,6 +335,12 @@ class events(object):
     def __len__(self):
         return self.get_nev()
 
+    def __getstate__(self):
+        #The spare capacity is not pickled
+        state = self.__dict__.copy()
+        state.pop('_events__buffer', None)
+        return state
+
     def __add__(self, other):
         self.add_adtm(other.ad, other.tm)
 
@@ -260,35 +414,64 @@ class events(object):
         self.__data['ad'] = ad.astype(self.dtype['ad'])
         self.__data['tm'] = tm.astype(self.dtype['tm'])
 
+    def capacity(self):
+        '''
+        Number of events that can be stored without reallocating (see reserve)
+        '''
+        if self.__buffer is None or self.__data.base is not self.__buffer:
+            return len(self.__data)
+        return len(self.__buffer)
+
+    def reserve(self, n):
+        '''
+        Preallocates storage for n events, so that add_adtm and add_adtmev do
+        not reallocate until the events object holds more than n events.
+        Beyond that, the storage grows by doubling, so that appending events
+        repeatedly takes linear time.
+        '''
+        if n <= self.capacity():
+            return
+        nev = len(self.__data)
+        buf = np.empty(max(n, nev), self.dtype)
+        buf[:nev] = self.__data
+        self.__buffer = buf
+        self.__data = buf[:nev]
+
+    def __append(self, ad, tm):
+        assert len(ad) == len(tm), "addresses and timestamps lengths are incompatible %d %d" % (len(ad), len(tm))
+        nev = len(self.__data)
+        n = nev + len(ad)
+        if n > self.capacity():
+            self.reserve(max(n, 2 * nev))
+        self.__buffer['ad'][nev:n] = ad
+        self.__buffer['tm'][nev:n] = tm
+        self.__data = self.__buffer[:n]
+
     def add_adtmev(self, ev):
         if not isinstance(ev, np.ndarray):
             ev = np.array(ev)
 
         if len(ev.shape) != self.NF:
-            ev = ev.reshape(-1, 2).astype(self.dtype)
+            ev = ev.reshape(-1, 2)
 
-        ad = np.concatenate([self.ad, ev[:, 0]])
-        tm = np.concatenate([self.tm, ev[:, 1]])
-        self.set_data(ad, tm)
+        self.__append(ev[:, 0], ev[:, 1])
 
     def add_adtm(self, ad, tm):
         if not isinstance(ad, np.ndarray):
             ad = np.array(ad)
 
         if len(ad.shape) != 1:
-            ad = ad.reshape(-1, 1)
+            ad = ad.reshape(-1)
 
         if not isinstance(tm, np.ndarray):
             tm = np.array(tm)
 
         if len(tm.shape) != 1:
-            tm = tm.reshape(-1, 1)
+            tm = tm.reshape(-1)
 
         assert tm.shape == ad.shape
 
-        ad = np.concatenate([self.ad, ad])
-        tm = np.concatenate([self.tm, tm])
-        self.set_data(ad, tm)
+        self.__append(ad, tm)
 
     def get_tmad(self):
         return np.array([self.tm, self.ad])
@@ -356,24 +539,33 @@ class events(object):
         """
         Map the events, given a mapping dictionary like:
         map[src]=[target1,target2,...,targetn],
+        or a (sources, offsets, targets) tuple in compressed sparse row format, as returned by pyNCS.mapping.Mapping.mapping_csr:
+        the targets of sources[i] are targets[offsets[i]:offsets[i+1]], and sources is sorted.
+        Each event is replaced by one event per target, with the same timestamp. The order of the events is kept.
         """
-        #The following is optimized for performance
         wasISI = False
         if self.isISI:
             wasISI = True
             self.set_abs_tm()
-        evs = self.get_adtmev()
-        ff = lambda x: x[0] in mapping
-        filt = filter(ff, evs) #keep only addresses that are mapped
-        if len(filt) > 0:
-            evs_filt = events(filt, self.atype).get_adtmev()
-            #Get mapped addresses
-            #list(chain(* concatenates lists of lists for low cost (i.e. O(n))
-            m_ad = np.array(list(itertools.chain(*map(mapping.get, evs_filt[:, 0]))), self.dtype['ad'])
-            #Get the respective timestamps
-            m_tm = np.array(list(itertools.chain(*map(lambda x: len(mapping.get(x[0])) * [x[1]], evs_filt))), self.dtype['tm'])
-
-            self.set_data(m_ad,m_tm)
+        if isinstance(mapping, dict):
+            mapping = mapping_dict_to_csr(mapping)
+        sources, offsets, targets = mapping
+
+        ad = self.get_ad()
+        idx = np.searchsorted(sources, ad)
+        if len(sources) > 0:
+            #keep only addresses that are mapped
+            mapped = sources[np.minimum(idx, len(sources) - 1)] == ad
+        else:
+            mapped = np.zeros(len(ad), 'bool')
+        idx = idx[mapped]
+        if len(idx) > 0:
+            #Fan-out: each event is repeated once per target
+            counts = offsets[idx + 1] - offsets[idx]
+            m_tm = np.repeat(self.get_tm()[mapped], counts)
+            first = np.repeat(offsets[idx] - (np.cumsum(counts) - counts), counts)
+            m_ad = targets[first + np.arange(len(m_tm))]
+            self.set_data(m_ad, m_tm)
         else:
             self.empty()
         if wasISI:
@@ -512,8 +704,9 @@ class channelEvents(dict):
 
     def flatten(self):
         ev = events(atype=self.atype)
+        ev.reserve(self.get_nev())
         for ch in self:
-            ev.add_adtmev(self.get_adtmev(ch))
+            ev.add_adtm(self.get_ad(ch), self.get_tm(ch))
         return ev
 
     def filter_channel(self, channel_list=None):
@@ -577,6 +770,17 @@ class channelEvents(dict):
             self[ch].filter_by_mapping(mapping[ch])
 
 
+def mapping_dict_to_csr(mapping):
+    """
+    Converts a one-to-many mapping dictionary (map[src]=[target1,...,targetn]) to the (sources, offsets, targets) compressed sparse row format used by events.filter_by_mapping
+    """
+    sources = np.array(sorted(mapping.keys()), 'uint32')
+    counts = np.array([len(mapping[k]) for k in sources], 'int')
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype('int')
+    targets = np.array(list(itertools.chain(*[mapping[k] for k in sources])), 'uint32')
+    return sources, offsets, targets
+
+
 def setDefaultMonChannelAddress(cs):
     """ Sets the default Monitoring Channel Addressing scheme (i.e. AER Output) in pyST globals, and used by pyAex. The argument is then returned when getDefaultMonChannelAddress is called
 
@@ -733,14 +937,36 @@ class channelAddressing:
             addrPhysicalExtract
         """
         ch_events = channelEvents(atype='Physical')
-        channel = (ev.get_ad() >> self.channelShift)&self.channelMask     # Get channel information.
-
-        for channelIdx in xrange(self.nChannels):
-            t = pylab.find(channelIdx == channel)
-            # Much faster than boolean list or filter
-            if len(t) > 0:
-                ad = (ev.get_ad()[t]) 
-                ch_events.add_adtmch(channelIdx, ad, ev.get_tm()[t])
+        data = ev.data
+        channel = self.extract_channels(data['ad'])     # Get channel information.
+
+        # Demultiplexing: the channel histogram gives the channels present in
+        # ev. When the events are not already grouped by channel, they are
+        # grouped by a stable sort on the (narrow) channel field, which keeps
+        # the temporal order within each channel, or by one scan per channel
+        # when only a few channels are present. Each channel then gets a
+        # (zero-copy) slice of the grouped events, which do not share memory
+        # with ev.
+        counts = np.bincount(channel, minlength=self.nChannels)
+        present = np.flatnonzero(counts)
+        present = present[present < self.nChannels]
+        if len(channel) == 0 or np.all(channel[1:] >= channel[:-1]):
+            data = data.copy()
+        elif len(present) <= DEMUX_MAX_SCAN:
+            for channelIdx in present:
+                ch_data = data.compress(channel == channelIdx)
+                ch_events.add_ch(int(channelIdx),
+                                 events._from_data(ch_data, atype=ch_events.atype))
+            return ch_events
+        else:
+            channel = channel.astype(np.min_scalar_type(self.channelMask))
+            data = data.take(np.argsort(channel, kind='stable'))
+
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        for channelIdx in present:
+            ch_data = data[offsets[channelIdx]:offsets[channelIdx + 1]]
+            ch_events.add_ch(int(channelIdx),
+                             events._from_data(ch_data, atype=ch_events.atype))
         return ch_events
 
     def extract_channels(self, addr):
@@ -826,11 +1052,12 @@ class channelAddressing:
 
         return mainAddr
 
-    def addrPhysicalConstruct(self, addr):
+    def addrPhysicalConstruct(self, addr, trusted=False):
         """
         Constructs Physical addresses to human readable addresses
 
         *addr*: dictionary of human readable numbers ( the physical addresses ), with channel numbers as keys
+        *trusted*: if True, addr is known to be in range and is not checked
 
         """
         addr = self.isChannelAddrList(addr)
@@ -840,7 +1067,7 @@ class channelAddressing:
                 mainAddr = np.concatenate((
                         mainAddr,
                         self[channelIdx].addrPhysicalConstruct(
-                            addr[channelIdx])
+                            addr[channelIdx], trusted=trusted)
                         + self.getValue(channelIdx
                         )))
         #Add Channel Part
@@ -879,7 +1106,7 @@ class channelAddressing:
         if not addr.dtype == np.uint32:
             addr = addr.astype(np.uint32)
 
-        channels= self.extract_channels(addr)
+        channels_in_addr = self.extract_channels(addr)
         channelEventsList = [None for i in xrange(self.nChannels)]
         for channelIdx in np.unique(channels_in_addr):
             t = (channels_in_addr == channelIdx)
@@ -887,17 +1114,25 @@ class channelAddressing:
             self[channelIdx].addrPhysicalLogical( addr[t] & self.addressMask)
         return channelEventsList
 
-    def importAER(self, input=None, sep='\t', dt=1e-6, format='a', isi=False, *args, **kwargs):
+    def importAER(self, input=None, sep='\t', dt=1e-6, format='a', isi=False, t_start=None, t_stop=None, *args, **kwargs):
         """
         Function for extracting, translating events from a numpy array. Output is a channelEvents object.
         
         Inputs:
-        *input*: if a string, will be treated as a filename and passed to np.loadtxt, if a numpy array, will be considered as events of dimension 2 x number of events. By default, the addresses are on [:,0]
-        *format*: either 't' or 'a' respectively meaning timestamps and addresses on the first column. ('a' by default)
+        *input*: if a string, will be treated as a filename and passed to np.loadtxt, if a numpy array, will be considered as events of dimension 2 x number of events. By default, the addresses are on [:,0]. Can also be an aerFile.
+        *format*: either 't' or 'a' respectively meaning timestamps and addresses on the first column. ('a' by default), or 'b' for a binary AER file (see aerFile)
+        *t_start*, *t_stop*: with binary AER files, only the events in [t_start, t_stop) (in timestamp units) are read and decoded
         *kwargs*: keyword arguments passed to np.loadtxt
         """
 
-        if isinstance(input, str):
+        if isinstance(input, str) and format == 'b':
+            input = aerFile(input)
+
+        if isinstance(input, aerFile):
+            #Timestamps are absolute in AER files
+            input = input.time_window(t_start, t_stop)
+            isi = False
+        elif isinstance(input, str):
             try:
                 if 'converters' in kwargs:
                     ae = np.loadtxt(input, **kwargs)
@@ -984,13 +1219,14 @@ class channelAddressing:
 
         return STStimOut
 
-    def rawoutput_from_chevents(self, ch_events, func=None, normalize=True, filter_duplicates=False):
+    def rawoutput_from_chevents(self, ch_events, func=None, normalize=True, filter_duplicates=False, n_workers=None):
         """
         this function acts like generateST, but constructs a RawOutput object which delays the decoding until it is necessary.
         *ch_events* is a channelEvents object of type 'p' (Physical)
 
         Inputs:
             *func* - a dictionary of functions with channels as keys to decode the addresses. If omitted, all the channels are considered
+            *n_workers* - number of threads used to decode the channels (see RawOutput)
             Outputs a RawOutput object
         """
         t_start = 0
@@ -1032,11 +1268,31 @@ class channelAddressing:
                 func_data,
                 t_start=t_start,
                 t_stop=t_stop,
-                filter_duplicates=filter_duplicates
+                filter_duplicates=filter_duplicates,
+                n_workers=n_workers
                 )
 
         return raw_out
 
+    def _encode_spikelist(self, channel, spikelist):
+        '''
+        Internal function returning the (N,2) uint32 array of the physical
+        addresses and the timestamps (in us) of the spikes of spikelist on
+        channel. Each id is translated once (see addrLogicalPhysical), and its
+        physical address is repeated for all its spikes.
+        '''
+        offsets, times = spikelist._flat()[:2]
+        counts = np.diff(offsets)
+        present = counts > 0
+        mapped_SL = np.empty((len(times), 2), 'uint32')
+        if len(times) > 0:
+            addrPhys = self[channel].addrLogicalPhysical(
+                np.asarray(spikelist.id_list(), 'float')[present])
+            mapped_SL[:, 0] = np.repeat(addrPhys + self.getValue(channel),
+                                        counts[present])
+            mapped_SL[:, 1] = times * 1000  # ms
+        return mapped_SL
+
     def exportAER(self, spikeLists, filename=None, format='a', isi=True, sep='\t', addr_format='%u', time_format='%u', *args, **kwargs):
         '''
         spikeLists can be of the follwing type:
@@ -1045,12 +1301,12 @@ class channelAddressing:
         - list of SpikeLists of dimension nChannels
         - dictionary with channels as keys and SpikeLists as values
         - SpikeList is given, it will be interpreted as {0: spikeLists}.
-        format specifies whether timestamps (format='t') or addresses (format='a') should be on the first column.
+        format specifies whether timestamps (format='t') or addresses (format='a') should be on the first column, or whether filename is a binary AER file (format='b', see save_aer).
         *addr_format* and *time_format* format to be used by np.savetxt
         '''
 
         out = []
-        assert format in ['t', 'a'], 'Format must be "a" or "t"'
+        assert format in ['t', 'a', 'b'], 'Format must be "a", "t" or "b"'
 
         if hasattr(spikeLists, 'to_chstlist'):
             #Assuming it is of type Monitors
@@ -1074,26 +1330,14 @@ class channelAddressing:
             raise RuntimeError(
                 "spikeLists must be either a: SpikeList, list or dict object")
 
-        ev = events(atype='Physical')
-
         #Translate logical addresses to physical using a mapping
         tic = time.time()
+        channel_events = []
         for ch in spikeLists:
             if isinstance(spikeLists[ch], SpikeList):
-                slrd = spikeLists[ch].raw_data()
-                if len(slrd) > 0:
-                    #addr_present=spikeLists[ch].id_list()
-                    # mapping=dict(zip(addr_present,self.addrPhysicalConstruct(
-                    # {ch:self[ch].addrLogicalExtract(addr_present)})))
-                    # Not using convert because it is very slow ( iterates over
-                    # all events )
-                    tmp_mapped_SL = np.fliplr(slrd)
-                    mapped_SL = np.zeros_like(tmp_mapped_SL, dtype='uint32')
-                    mapped_SL[:, 1] = tmp_mapped_SL[:, 1] * 1000  # ms
-                    mapped_SL[:, 0] = self[ch].addrLogicalPhysical(tmp_mapped_SL[:, 0]) + self.getValue(ch)
-                    ev.add_adtmev(mapped_SL)
-                    # ev.add_adtmev(mapSpikeListAddresses(spikeLists[ch],mappin
-                    # g).convert(format='[id,time*1000]'))
+                mapped_SL = self._encode_spikelist(ch, spikeLists[ch])
+                if len(mapped_SL) > 0:
+                    channel_events.append(mapped_SL)
                 else:
                     print("Warning: Empty SpikeList encountered")
         tictoc = time.time() - tic
@@ -1102,19 +1346,17 @@ class channelAddressing:
 
         #Multiplex
         tic = time.time()
-        sortedIdx = np.argsort(ev.get_tm())
+        data = _multiplex(channel_events)
         tictoc = time.time() - tic
         if PERFORMANCE_DEBUG:
             print("Multiplexing took {0} seconds".format(tictoc))
 
-        tic = time.time()
         #Create new sorted events object
-        if len(sortedIdx) > 0:
-            ev = events(ev.get_adtmev()[sortedIdx, :], atype='p')
+        if len(data) > 0:
             #exportAER
             if isi:
-                ev.set_isi()
-
+                data['tm'][1:] = np.diff(data['tm'])
+            ev = events._from_data(data, atype='p', isISI=isi)
         else:
             ev = events(atype='p')
 
@@ -1124,7 +1366,9 @@ class channelAddressing:
         #Otherwise write to file
         else:
             #exportAER_file
-            if format is 'a':
+            if format is 'b':
+                save_aer(filename, ev, self, isi=isi)
+            elif format is 'a':
                 np.savetxt(filename, ev.get_adtmev(),
                     fmt=addr_format + sep + time_format)
             elif format is 't':
@@ -1141,44 +1385,218 @@ class channelAddressing:
 STChannelAddressing = channelAddressing
 
 
-def addrLogicalConstruct(stas, addr):
+def _multiplex(channel_events):
+    """
+    Merges the (N,2) uint32 (addr, tm) arrays of channel_events into a single
+    physical events structured array sorted by timestamp. The merge is
+    stable: simultaneous events keep the order of channel_events, and their
+    order within each array.
+
+    The arrays are copied once into preallocated buffers, and are sorted
+    together by packing the timestamp and the position of each event in a
+    uint64 key.
+    """
+    nev = sum(len(ev) for ev in channel_events)
+    data = np.empty(nev, events(atype='p').dtype)
+    if nev >= 2 ** 32:
+        #Positions do not fit in the key, fall back to a stable argsort
+        adtm = np.concatenate(channel_events)
+        order = np.argsort(adtm[:, 1], kind='mergesort')
+        data['ad'] = adtm[order, 0]
+        data['tm'] = adtm[order, 1]
+        return data
+
+    key = np.empty(nev, 'uint64')
+    ad = np.empty(nev, 'uint32')
+    offset = 0
+    for ev in channel_events:
+        n = len(ev)
+        key[offset:offset + n] = ev[:, 1]
+        key[offset:offset + n] <<= 32
+        key[offset:offset + n] |= np.arange(offset, offset + n, dtype='uint64')
+        ad[offset:offset + n] = ev[:, 0]
+        offset += n
+    key.sort()
+    data['ad'] = ad[(key & np.uint64(2 ** 32 - 1)).astype('intp')]
+    data['tm'] = key >> np.uint64(32)
+    return data
+
+
+#Binary AER container:
+#  AER_MAGIC | header length (uint32) | json header, padded to 8 bytes |
+#  records (events dtype, i.e. uint32 timestamp and address) |
+#  chunk index (uint32 timestamp of every chunk_size-th record)
+#Timestamps are stored as absolute times.
+AER_MAGIC = 'PYSTAER1'
+AER_CHUNK_SIZE = 2**16
+
+
+def _aer_header_default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, xrange):
+        return list(obj)
+    raise TypeError("{0} cannot be saved in an AER file header".format(repr(obj)))
+
+
+def _aer_header_hook(obj):
+    return dict((str(k), str(v) if isinstance(v, unicode) else v)
+                for k, v in obj.iteritems())
+
+
+def save_aer(filename, ev, chaddr=None, isi=False, chunk_size=AER_CHUNK_SIZE):
+    """
+    Writes physical events to filename in the binary AER format (see aerFile).
+
+    *ev*: events object or numpy array in (addr, time) format
+    *chaddr*: channelAddressing whose specification is saved in the header (optional)
+    *isi*: if True, the timestamps of *ev* are inter-spike intervals. They are saved as absolute times.
+    *chunk_size*: number of records between two entries of the time index
+    """
+    if not isinstance(ev, events):
+        ev = events(np.asarray(ev).reshape(-1, 2), atype='p')
+    data = np.zeros(ev.nev, events(atype='p').dtype)
+    data['ad'] = ev.get_ad()
+    data['tm'] = ev.get_tm()
+    if isi:
+        data['tm'] = np.cumsum(data['tm'])
+
+    header = {
+        'version': 1,
+        'n_events': len(data),
+        'chunk_size': chunk_size,
+        'sorted': bool(np.all(data['tm'][1:] >= data['tm'][:-1])),
+        }
+    if chaddr is not None:
+        header['channelBits'] = list(chaddr.channelShift +
+                                     np.arange(chaddr.nChannelBits))
+        header['stas'] = [None if st is None else
+                          {'name': st.id, 'addrConf': st.addrConf}
+                          for st in chaddr.stasList]
+    header = json.dumps(header, default=_aer_header_default)
+    header += ' ' * (-(len(AER_MAGIC) + 4 + len(header)) % 8)
+
+    with open(filename, 'wb') as f:
+        f.write(AER_MAGIC)
+        f.write(np.uint32(len(header)).tobytes())
+        f.write(header)
+        f.write(data.tobytes())
+        f.write(data['tm'][::chunk_size].astype('<u4').tobytes())
+
+
+class aerFile(object):
+    """
+    Binary AER recording, written by save_aer or exportAER(format='b').
+    The records are memory mapped: only the parts which are used are read from disk.
+
+    >>> rec = aerFile('exp.aer')
+    >>> ch_evs = nsetup.mon.importAER(rec, t_start=10e6, t_stop=11e6)
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            if f.read(len(AER_MAGIC)) != AER_MAGIC:
+                raise IOError("{0} is not an AER file".format(filename))
+            header_len = int(np.frombuffer(f.read(4), '<u4')[0])
+            self.header = json.loads(f.read(header_len),
+                                     object_hook=_aer_header_hook)
+        offset = len(AER_MAGIC) + 4 + header_len
+        n = self.header['n_events']
+        dtype = events(atype='p').dtype
+        if n > 0:
+            self.data = np.memmap(filename, dtype=dtype, mode='r',
+                                  offset=offset, shape=(n,))
+            self.index = np.memmap(filename, dtype='<u4', mode='r',
+                                   offset=offset + n * dtype.itemsize)
+        else:
+            self.data = np.zeros([0], dtype)
+            self.index = np.zeros([0], 'uint32')
+        self.chunk_size = self.header['chunk_size']
+
+    def __len__(self):
+        return len(self.data)
+
+    def channel_addressing(self):
+        """
+        Returns the channelAddressing saved in the header (None if no specification was saved)
+        """
+        if 'stas' not in self.header:
+            return None
+        stasList = [None if st is None else
+                    addrSpec(name=st['name'], addrConf=st['addrConf'])
+                    for st in self.header['stas']]
+        return channelAddressing(stasList=stasList,
+                                 channelBits=self.header['channelBits'])
+
+    def _searchsorted(self, t):
+        # Index of the first record with timestamp >= t, reading only one chunk
+        c = np.searchsorted(self.index, t, 'left')
+        lo = max(c - 1, 0) * self.chunk_size
+        hi = min(c * self.chunk_size, len(self.data))
+        return lo + np.searchsorted(self.data['tm'][lo:hi], t, 'left')
+
+    def time_window(self, t_start=None, t_stop=None):
+        """
+        Returns the (physical) events with t_start <= timestamp < t_stop as an events object. The events are a read-only view of the file.
+        """
+        if not self.header['sorted']:
+            tm = self.data['tm']
+            idx = np.ones(len(tm), 'bool')
+            if t_start is not None:
+                idx &= tm >= t_start
+            if t_stop is not None:
+                idx &= tm < t_stop
+            return events._from_data(self.data[idx], atype='p')
+        i0 = 0 if t_start is None else self._searchsorted(t_start)
+        i1 = len(self.data) if t_stop is None else self._searchsorted(t_stop)
+        return events._from_data(self.data[i0:max(i0, i1)], atype='p')
+
+    def iter_windows(self, duration, t_start=None, t_stop=None):
+        """
+        Iterates over consecutive time windows of *duration* (in timestamp units). Yields (t, events) tuples, where t is the start of the window.
+        """
+        if len(self.data) == 0:
+            return
+        tm = self.data['tm']
+        if t_start is None:
+            t_start = tm[0] if self.header['sorted'] else tm.min()
+        if t_stop is None:
+            t_stop = (tm[-1] if self.header['sorted'] else tm.max()) + 1
+        for t in np.arange(t_start, t_stop, duration):
+            yield t, self.time_window(t, min(t + duration, t_stop))
+
+
+def load_aer(filename):
+    """
+    Opens a binary AER file. See aerFile.
+    """
+    return aerFile(filename)
+
+
+def addrLogicalConstruct(stas, addr, trusted=False):
     """
     Constructs Logical addresses, *i.e.* addresses in float format useful for plotting because they keep the neuron - synapse order.
 
     **NOTE:** Logical addresses do not contain channel information
 
     *addr*: address (in a form `isValidAddress <pyst.isValidAddress>`_ can understand)
+    *trusted*: if True, addr is known to be in range and is not checked
     """
 
     #Check and Parse Address
-    nEntries, addr = isValidAddress(stas, addr)
-    #Initialize logical address vector (double)
-    addrLogical = np.zeros([nEntries], 'float')
-
-    #Integer component
-    IntCmp = np.zeros([nEntries])
-    #Fractional component
-    FracCmp = np.zeros([nEntries])
-    IntBitsUsed = np.zeros([nEntries])
-    FracBitsUsed = np.zeros([nEntries])
-
-    for hrf_index, hrf in enumerate(stas.iter_hrfs()):  # hrf_index
-        #Sanity check
-        assert np.all((addr[hrf_index, :] & (2 ** hrf['width'] - 1))
-             == addr[hrf_index, :]), "Cropped significant bits"
+    nEntries, addr = isValidAddress(stas, addr, trusted=trusted)
 
-        if hrf['type'] is 1:
-            IntCmp = IntCmp + addr[hrf_index, :] * 2 ** IntBitsUsed
-            IntBitsUsed = IntBitsUsed + hrf['width']
+    #Sanity check
+    assert np.all((addr & stas.physicalPlan.masks[:, None]) == addr),\
+        "Cropped significant bits"
 
-        elif hrf['type'] is -1:
-            # Considered using length instead: creates rational numbers such as
-            # 0.33333333 which does not look nice
-            FracBitsUsed = FracBitsUsed + hrf['width']
-            FracCmp = FracCmp + addr[hrf_index, :] * 2 ** (-FracBitsUsed)
-
-    addrLogical = np.array(IntCmp + FracCmp, 'float')
-    return addrLogical
+    #Neuron fields make the integer component, synapse fields the fractional
+    #component
+    IntCmp = stas.logicalIntPlan.encode(addr)
+    FracCmp = stas.logicalFracPlan.encode(addr)
+    return IntCmp + FracCmp * 2. ** (-stas.nbits[-1])
 
 
 def addrLogicalExtract(stas, addrLogical):
@@ -1188,8 +1606,6 @@ def addrLogicalExtract(stas, addrLogical):
     #TODO: Check and Parse Address
     addrLogical = np.array(addrLogical, 'float')
     nEntries = addrLogical.shape[0]
-    FracBits = stas.nbits[-1]
-    IntBits = 0
 
     #assert nEntries>0
     #Initialize logical address vector (double)
@@ -1199,40 +1615,25 @@ def addrLogicalExtract(stas, addrLogical):
     addr_int = addr_int.astype('int')
     addr_frac = (addr_frac * 2 ** stas.nbits[-1]).astype('int')
 
-    for hrf_index, hrf in enumerate(stas.iter_hrfs()):  # hrf_index
-        if hrf['type'] is 1:
-            mask = (2 ** hrf['width'] - 1)
-            addr[hrf_index, :] = (addr_int >> IntBits) & mask
-            IntBits += hrf['width']
-        elif hrf['type'] is -1:
-            FracBits -= hrf['width']
-            addr[hrf_index, :] = (addr_frac >> FracBits) & (
-                2 ** hrf['width'] - 1)
-            #decimal part
-
+    stas.logicalIntPlan.decode(addr_int, addr)
+    stas.logicalFracPlan.decode(addr_frac, addr)
     return addr
 
 
-def addrPhysicalConstruct(stas, addr):
+def addrPhysicalConstruct(stas, addr, trusted=False):
     """
-    Description here
+    Constructs Physical addresses, *i.e.* the addresses of the hardware.
+
+    *addr*: address (in a form `isValidAddress <pyst.isValidAddress>`_ can understand)
+    *trusted*: if True, addr is known to be in range and is not checked
     """
 
     #Check and Parse Address
-    nEntries, addr = isValidAddress(stas, addr)
+    nEntries, addr = isValidAddress(stas, addr, trusted=trusted)
 
     #Initialize physical address vector (integer)
     addr = stas.addr_encoder.encode(addr)
-
-    addrPhysical = [[]] * len(stas.field)
-    for fieldIndex, field in enumerate(stas.iter_fields()):
-        addrPhysical[fieldIndex] = field.construct(addr[fieldIndex])
-    addrPhysical = np.sum(zip(*addrPhysical), 1)
-
-    #Build dictionary for quick reference
-    stas.addrPhysicalExtract(addrPhysical)
-
-    return np.array(addrPhysical, 'uint32')
+    return stas.encode(addr)
 
 
 def isValidPhysicalAddress(stas, addrPhys):
@@ -1274,9 +1675,18 @@ def addrPhysicalExtract(stas, addrPhys):
 
 def addrPhysicalLogical(stas, addrPhys):
     """
-    Direct translation from Physical Addresses to Logical addresses using a hash table
+    Direct translation from Physical Addresses to Logical addresses using a lookup table, or a hash table if the address specification is too wide for a lookup table (see addrBuildLUT)
     """
     addrPhys=isValidPhysicalAddress(stas, addrPhys)
+    if not stas.addrLUTBuilt:
+        addrBuildLUT(stas)
+    if stas.addrLogicalLUT is not None:
+        if np.all(addrPhys < len(stas.addrLogicalLUT)):
+            addrLog = stas.addrLogicalLUT[addrPhys]
+            #NaNs are invalid addresses, let the decoder deal with them
+            if not np.any(np.isnan(addrLog)):
+                return addrLog
+
     #failedIndex=np.where(stas.addrExtractLogicalFast[addrPhys]==-1)[0]
     failedIndex = np.setdiff1d(addrPhys, stas.addrExtractLogicalFast.keys())
     #Don't even bother calling decode if everyone is in
@@ -1301,38 +1711,78 @@ def addrPhysicalLogical(stas, addrPhys):
 
 def addrLogicalPhysical(stas, addrLogical, *args, **kwargs):
     """
-    Direct translation from Logical Addresses to Physical addresses using a hash table
+    Direct translation from Logical Addresses to Physical addresses using a lookup table (see addrBuildLUT)
     """
-    #Don't even bother calling decode if everyone is in
-    try:
-        # Failed? decode the address
-        return addrLogicalPhysicalDecode(stas, addrLogical)  
-    except AssertionError as e:
-        print('Error in addrLogicalPhysicalDecode.')
-        print('No. of addresses in the packet : {0}'.
-            format(len(addrLogical)))
-        raise e
-
-def _buildGrid(inlist):
-    nD = len(inlist)
-    min_list = [0] * nD
-    max_list = [None] * nD
-    for i in range(nD):
-        max_list[i] = len(inlist[i])
-    strmgrid = 'np.mgrid['
-    for fieldIdx in xrange(nD):
-        strmgrid = strmgrid + '{0}:{1},'.format(
-            min_list[fieldIdx], max_list[fieldIdx])
-    strmgrid = strmgrid + ']'
-    allpo = eval(strmgrid)
-    tot = np.prod(allpo[0].shape)
-    grid = np.zeros([tot, len(allpo)], dtype=type(min_list[0]))
-    grid_values = np.zeros_like(grid)
-    for j in range(len(allpo)):
-        grid[:, j] = allpo[j].flatten()
-    for i in range(nD):
-        grid_values[:, i] = np.array(inlist[i])[grid[:, i]]
-    return grid_values
+    if not stas.addrLUTBuilt:
+        addrBuildLUT(stas)
+    if stas.addrPhysicalLUT is not None:
+        addrLog = np.asarray(addrLogical, 'float')
+        key = np.rint(addrLog * 2 ** stas.nbits[-1])
+        if addrLog.ndim == 1 and np.all((key >= 0) & (key < len(stas.addrPhysicalLUT))):
+            addrPhys = stas.addrPhysicalLUT[key.astype('int')]
+            if np.all(key == addrLog * 2 ** stas.nbits[-1]) and\
+               not np.any(addrPhys == LUT_INVALID):
+                return addrPhys
+
+    #Invalid or untabulated addresses: decode the ones missing from the hash
+    #table, once per distinct address
+    addrLog, inverse = np.unique(addrLogical, return_inverse=True)
+    failedIndex = np.setdiff1d(addrLog, stas.addrExtractPhysicalFast.keys())
+    if len(failedIndex) > 0:
+        try:
+            addrLogicalPhysicalDecode(stas, failedIndex)
+        except AssertionError as e:
+            print('Error in addrLogicalPhysicalDecode.')
+            print('No. of addresses in the packet : {0}'.
+                format(len(addrLogical)))
+            raise e
+
+    fastAddr = np.array(
+        map(stas.addrExtractPhysicalFast.get, addrLog), 'uint32')
+    return fastAddr[inverse]
+
+_grid_cache = dict()
+_grid_cache_size = 0
+
+
+def _buildGrid(inlist, memoize=False):
+    '''
+    Builds the cartesian product of the input lists, one combination per row
+    with the last list varying fastest. Ex:
+    >>> _buildGrid([[0,1],[0,2,3]])
+    >>> array([[0, 0],
+               [0, 2],
+               [0, 3],
+               [1, 0],
+               [1, 2],
+               [1, 3]], dtype=uint32)
+    If memoize is True, e.g. for the ranges of an address specification, the
+    grid is memoized by the contents of the lists and returned read-only.
+    Grids of more than GRID_CACHE_SIZE elements are not memoized.
+    '''
+    global _grid_cache_size
+    values = [np.array(l, dtype='uint32', ndmin=1).ravel() for l in inlist]
+    if memoize:
+        key = tuple(v.tostring() for v in values)
+        try:
+            return _grid_cache[key]
+        except KeyError:
+            pass
+    nD = len(values)
+    shape = [len(v) for v in values]
+    grid = np.empty([nD] + shape, dtype='uint32')
+    for i, v in enumerate(values):
+        grid[i] = v.reshape([-1] + [1] * (nD - 1 - i))
+    grid = np.ascontiguousarray(grid.reshape(nD, -1).T)
+    if not memoize or grid.size > GRID_CACHE_SIZE:
+        return grid
+    grid.setflags(write=False)
+    if _grid_cache_size + grid.size > GRID_CACHE_SIZE:
+        _grid_cache.clear()
+        _grid_cache_size = 0
+    _grid_cache_size += grid.size
+    _grid_cache[key] = grid
+    return grid
 
 
 def addrBuildHashTable(stas):
@@ -1356,13 +1806,81 @@ def addrBuildHashTable(stas):
     for i in range(len(stas)):
         addrLens[i] = stas[i]['range']
 
-    grid = _buildGrid(addrLens)
+    grid = _buildGrid(addrLens, memoize=True)
 
-    stas.allpos = stas.addrLogicalConstruct(grid.transpose())
+    stas.allpos = stas.addrLogicalConstruct(grid.transpose(), trusted=True)
     addr_phys = addrLogicalPhysicalDecode(stas, stas.allpos)
     addrPhysicalLogicalDecode(stas, addr_phys)
 
 
+def addrBuildLUT(stas):
+    """
+    addrBuildLUT(stas) constructs the dense lookup tables used by addrPhysicalLogical and addrLogicalPhysical:
+
+    - stas.addrLogicalLUT: float array indexed by physical address, NaN for invalid addresses
+    - stas.addrPhysicalLUT: uint32 array indexed by logical address * 2**stas.nbits[-1], LUT_INVALID for invalid addresses
+
+    The tables are left to None if the physical or the logical addresses are wider than LUT_MAX_BITS bits. Translation then falls back to decoding and hash tables.
+
+    *stas:* addrSpec object.
+    """
+    if any(hrf['range'] is None for hrf in stas.iter_hrfs()):
+        stas.addrLUTBuilt = True
+        return
+    physBits = max([hrf['shift'] + hrf['width'] for hrf in stas.iter_hrfs()])
+    logBits = stas.nbits[1] + stas.nbits[-1]
+    if max(physBits, logBits) > LUT_MAX_BITS:
+        stas.addrLUTBuilt = True
+        return
+
+    #Decode all the possible physical addresses
+    addr = addrPhysicalExtractDecode(stas, np.arange(2 ** physBits, dtype='uint32'))
+    valid = _addrInRange(stas, addr)
+    logicalLUT = np.empty(2 ** physBits, 'float')
+    logicalLUT.fill(np.nan)
+    logicalLUT[valid] = addrLogicalConstruct(stas, addr[:, valid], trusted=True)
+
+    #Decode all the possible logical addresses
+    addr = addrLogicalExtract(stas, np.arange(2 ** logBits) / 2. ** stas.nbits[-1])
+    valid = _addrInRange(stas, addr)
+    addr = stas.addr_encoder.encode(addr[:, valid])
+    physicalLUT = np.empty(2 ** logBits, 'uint32')
+    physicalLUT.fill(LUT_INVALID)
+    physicalLUT[valid] = stas.encode(addr)
+
+    #The tables are only published once complete (channels may be decoded
+    #concurrently, see RawOutput.decode_all_channels)
+    stas.addrLogicalLUT = logicalLUT
+    stas.addrPhysicalLUT = physicalLUT
+    stas.addrLUTBuilt = True
+
+
+def _addrInRange(stas, addr):
+    """
+    Returns a boolean array telling which human readable addresses (one per column of addr) are in the range of the address specification
+    """
+    valid = np.ones(addr.shape[1], 'bool')
+    for hrf_index in stas.iter_hrf_index():
+        valid &= _fieldInRange(stas, hrf_index, addr[hrf_index, :])
+    return valid
+
+
+def _fieldInRange(stas, hrf_index, values):
+    """
+    Returns a boolean array telling which values (uint32) are in the range of field hrf_index, using the range masks of the address specification when available
+    """
+    mask = stas.rangeMasks[hrf_index]
+    if mask is None:
+        if stas[hrf_index]['range'] is None:
+            return np.ones(len(values), 'bool')
+        return np.in1d(values, stas[hrf_index]['range'])
+    if len(values) == 0 or values.max() < len(mask):
+        return mask[values]
+    valid = values < len(mask)
+    valid[valid] = mask[values[valid]]
+    return valid
+
+
 def addrPhysicalExtractDecode(stas, addrPhys):
     """
     addrPhysicalExtract takes a physical address as argument and returns a list containing the addresses in human readable form.
@@ -1373,14 +1891,7 @@ def addrPhysicalExtractDecode(stas, addrPhys):
     *addrPhys*: an integer or an iterable containing integers representing physical addresses
     """
 
-    #initalize address list
-    if not hasattr(addrPhys, '__len__'):
-        addrPhys = [addrPhys]
-
-    addr = np.zeros([len(stas.field), len(addrPhys)], 'uint32')
-    for fieldIndex, field in enumerate(stas.iter_fields()):
-        addr[fieldIndex, :] = field.extract(addrPhys)
-    addr = stas.addr_encoder.decode(addr)
+    addr = stas.addr_encoder.decode(stas.decode(addrPhys))
 
     return addr
 
@@ -1406,7 +1917,7 @@ def addrLogicalPhysicalDecode(stas, addrLog):
     return addrPhys
 
 
-def isValidAddress(stas, addrList):
+def isValidAddress(stas, addrList, trusted=False):
     """
     This is an internal function which verifies that the given "human readable" address is consistent with the address specification. It also takes care of "filling in" the addresses: for example [range(15),2] is understood as [range(15),[2]*15].
 
@@ -1414,6 +1925,7 @@ def isValidAddress(stas, addrList):
 
     *stas*: an address specification object `addrSpec <pyST.addrSpec>`_
     *addrList*: a list of human readable addresses such as [range(15), 5]. It also accepts numpy arrays and transforms it accordingly
+    *trusted*: if True, the addresses are known to be in range and the range check is skipped
     """
 
         #    return len(addrList[0]),addrList
@@ -1445,31 +1957,22 @@ def isValidAddress(stas, addrList):
         else:
             nEntries = 1
 
-        #Initialize address list
-        addrListFilled = [[-1] * nEntries for i in xrange(stas.nDims)]
-
-        addrListFilled = _buildGrid(addrList).astype('uint32').transpose(
-            )  # not good make buildGrid use same type as in the min/max lists
+        addrListFilled = _buildGrid(addrList).transpose()
 
     else:
         addrListFilled = addrList.astype('uint32')
         nEntries = addrListFilled.shape[1]
 
     #Range Check
+    if trusted:
+        return nEntries, addrListFilled
     for hrf_index, hrf in enumerate(stas.iter_hrfs()):
-        assert np.all(addrListFilled[hrf_index, :]
-            >= 0), "Address must be a postive integer."
-        diffs = np.setdiff1d(
-            np.unique(addrListFilled[hrf_index, :]), hrf['range'])
-        if len(diffs) != 0:
-            try:
-                err_ind = np.where(addrListFilled[hrf_index] == diffs)[0]
-            except Exception as e:
-                print(np.where(addrListFilled[hrf_index] == diffs), diffs)
-                raise AssertionError(None, None)
+        valid = _fieldInRange(stas, hrf_index, addrListFilled[hrf_index, :])
+        if not valid.all():
+            err_ind = np.flatnonzero(~valid)
             wrongaddr = addrListFilled[:, err_ind]
             print("Address {3} is not in Range list ({0},{1}). Offending addresses on dimension {2}.".format(
-                    np.max(hrf['range']),
+                    np.min(hrf['range']),
                     np.max(hrf['range']),
                     hrf_index,
                     wrongaddr))
@@ -1504,6 +2007,49 @@ class layoutFieldEncoder:  # private
         self.extract = lambda x: (x>>shift)&mask
         self.construct = lambda x: (x)<<shift
 
+class bitPlan:  # private
+    """
+    Internal struct used for addrSpec, packing some of the fields of addresses
+    (one field per row of a two-dimensional array) into integers and unpacking
+    them, given a shift and a width per field. The packed fields are summed,
+    which is a bitwise or if they do not overlap.
+
+    *rows*: indexes of the fields
+    """
+
+    def __init__(self, rows, shifts, widths, dtype='uint32'):
+        self.dtype = np.dtype(dtype)
+        self.rows = list(rows)
+        self.shifts = np.array(shifts, self.dtype)
+        self.masks = np.array([2 ** w - 1 for w in widths], self.dtype)
+
+    def encode(self, addr):
+        """
+        Packs the fields of addr into an array of integers
+        """
+        out = np.zeros(np.shape(addr)[1], self.dtype)
+        tmp = np.empty_like(out)
+        for row, shift in zip(self.rows, self.shifts):
+            np.left_shift(addr[row], shift, out=tmp, casting='unsafe')
+            out += tmp
+        return out
+
+    def decode(self, packed, out=None):
+        """
+        Unpacks the fields from an array of integers into the corresponding
+        rows of out (a new uint32 array if None)
+        """
+        packed = np.array(packed, self.dtype, copy=False, ndmin=1)
+        if out is None:
+            out = np.zeros([max(self.rows) + 1 if self.rows else 0,
+                            len(packed)], 'uint32')
+        tmp = np.empty_like(packed)
+        for row, shift, mask in zip(self.rows, self.shifts, self.masks):
+            np.right_shift(packed, shift, out=tmp)
+            tmp &= mask
+            out[row] = tmp
+        return out
+
 TYPE_TO_NAME_DICT = { -1 : 'synapse dimension', 0 : 'other dimension', 1 : 'neuron dimension'}
 
 def repr_addr_spec(addr_spec, nBitsTotal):
@@ -1561,8 +2107,16 @@ class addrSpec:
         self.nDims = len(self.addrConf)
         self.field, self.nFields = _stas_create_fields(self,self.nBits, self.addrConf)
         self.nbits = _stas_compute_nbits(self.addrConf)
+        self.physicalPlan, self.logicalIntPlan, self.logicalFracPlan = \
+            _stas_compile_plans(self.addrConf)
+        self.rangeMasks = _stas_compile_range_masks(self.addrConf)
         self.addrExtractLogicalFast = dict()
         self.addrExtractPhysicalFast = dict()
+        self.addrConstructCache = dict()
+        self.addrConstructCacheSize = 0
+        self.addrLUTBuilt = False
+        self.addrLogicalLUT = None
+        self.addrPhysicalLUT = None
 
     def __len__(self):
         return self.nDims
@@ -1604,6 +2158,21 @@ class addrSpec:
     def __getitem__(self, field):
         return self.addrConf[field]
 
+    def encode(self, addr):
+        '''
+        Packs human readable addresses (one row per field) into physical
+        addresses, according to the shift of each field. No range check is
+        done, see addrPhysicalConstruct.
+        '''
+        return self.physicalPlan.encode(addr)
+
+    def decode(self, addrPhys):
+        '''
+        Unpacks physical addresses into human readable addresses (one row per
+        field). No range check is done, see addrPhysicalExtract.
+        '''
+        return self.physicalPlan.decode(addrPhys)
+
     def __getNHML__(self):
         '''
         Returns xml representation of this object
@@ -1737,6 +2306,46 @@ def _stas_create_fields(addrSpec,nBits,addrConf):
     return field, nFields
 
 
+def _stas_compile_plans(addrConf):
+    """
+    Compiles the bit plans packing the fields into physical addresses, and
+    into the integer (neuron fields) and fractional (synapse fields) parts of
+    logical addresses
+    """
+    physicalPlan = bitPlan(range(len(addrConf)),
+                           [hrf['shift'] for hrf in addrConf],
+                           [hrf['width'] for hrf in addrConf])
+    rows = {1: [], -1: []}
+    widths = {1: [], -1: []}
+    for hrf_index, hrf in enumerate(addrConf):
+        if hrf['type'] in rows:
+            rows[hrf['type']].append(hrf_index)
+            widths[hrf['type']].append(hrf['width'])
+    # Neuron fields are packed from the least significant bit, synapse fields
+    # from the most significant bit of the fractional part
+    intShifts = np.cumsum([0] + widths[1])[:-1]
+    fracShifts = sum(widths[-1]) - np.cumsum(widths[-1])
+    logicalIntPlan = bitPlan(rows[1], intShifts, widths[1], 'int64')
+    logicalFracPlan = bitPlan(rows[-1], fracShifts, widths[-1], 'int64')
+    return physicalPlan, logicalIntPlan, logicalFracPlan
+
+
+def _stas_compile_range_masks(addrConf):
+    """
+    Builds, for each field, a boolean array telling which values are in its
+    range, or None if the range is too wide (see LUT_MAX_BITS)
+    """
+    masks = []
+    for hrf in addrConf:
+        if hrf['range'] is None or max(hrf['range']) >= 2 ** LUT_MAX_BITS:
+            masks.append(None)
+        else:
+            mask = np.zeros(max(hrf['range']) + 1, 'bool')
+            mask[list(hrf['range'])] = True
+            masks.append(mask)
+    return masks
+
+
 def _stas_compute_nbits(addrConf):
     nbits = {-1: 0, 1: 0, 0: 0, -2:0}
     for a in addrConf:
@@ -145,6 +145,14 @@ class StGen:
         inh_2Dadaptingmarkov_generator - inhomogeneous adapting and
                                          refractory markov process (time varying)
 
+        Population spike trains (columnar (id, time) arrays):
+        ------------------------------------------------------
+
+        poisson_population_generator - homogeneous Poisson processes
+        regular_population_generator - regularly spaced spike trains
+        regular_gaussian_population_generator - Gaussian jittered regular spike trains
+        inh_poisson_population_generator - inhomogeneous Poisson processes
+
         Continuous time processes:
         --------------------------
 
@@ -407,6 +415,186 @@ class StGen:
 
         return SpikeTrain(spike_train, t_start=t[0], t_stop=t_stop)
 
+    def _population_columns(self, ids, counts, times):
+        """
+        Stacks the per-neuron spike counts and the flat spike times into the
+        columnar (id, time) array returned by the population generators.
+        """
+        spikes = numpy.empty((len(times), 2), 'float')
+        spikes[:, 0] = numpy.repeat(ids, counts)
+        spikes[:, 1] = times
+        return spikes
+
+    def poisson_population_generator(self, ids, rate, t_start=0.0, t_stop=1000.0):
+        """
+        Returns the spikes of a population of independent Poisson processes
+        as a columnar (N,2) array of (id, time) pairs, grouped by id in the
+        order of ids and sorted in time within each id. The result can be fed
+        directly to SpikeList or ColumnarSpikeList.
+
+        All spike counts are drawn at once, and the spike times of each neuron
+        are obtained as the normalized cumulative sum of exponential spacings,
+        which yields sorted uniform order statistics without sorting.
+
+        Inputs:
+            ids     - the ids of the neurons
+            rate    - the rate of the discharge (in Hz). Scalar or one per id
+            t_start - the beginning of the spike trains (in ms)
+            t_stop  - the end of the spike trains (in ms)
+
+        Examples:
+            >> gen.poisson_population_generator(range(1000), 50, 0, 1000)
+
+        See also:
+            poisson_generator, regular_population_generator
+        """
+        ids = numpy.asarray(ids, 'float').reshape(-1)
+        rate = numpy.broadcast_to(numpy.asarray(rate, 'float'), ids.shape)
+        lam = numpy.maximum(rate, 0) * (t_stop - t_start) / 1000.0
+        counts = self.rng.poisson(lam) if t_stop > t_start else \
+            numpy.zeros(len(ids), 'int')
+
+        # Spike k of a neuron with n spikes sits at S_k/S_{n+1}, where S are
+        # the partial sums of n+1 exponential spacings
+        ends = numpy.cumsum(counts + 1) - 1
+        cs = numpy.cumsum(self.rng.exponential(size=ends[-1] + 1 if len(ends) else 0))
+        base = numpy.zeros(len(ids))
+        base[1:] = cs[ends[:-1]]
+        keep = numpy.ones(len(cs), 'bool')
+        keep[ends] = False
+        times = cs[keep]
+        times -= numpy.repeat(base, counts)
+        times *= numpy.repeat((t_stop - t_start) / (cs[ends] - base), counts)
+        times += t_start
+
+        return self._population_columns(ids, counts, times)
+
+    def regular_population_generator(self, ids, rate, phase=0.0, jitter=True, t_start=0.0, t_stop=1000.0):
+        """
+        Returns the spikes of a population of regular spike trains as a
+        columnar (N,2) array of (id, time) pairs, grouped by id in the order
+        of ids and sorted in time within each id. Each row is equivalent to
+        regular_generator with the corresponding rate and phase.
+
+        Inputs:
+            ids     - the ids of the neurons
+            rate    - the rate of the discharge (in Hz). Scalar or one per id
+            phase   - Offset the spiketrains by this number (in ms.). Scalar or one per id
+            jitter  - whether each spiketrain should be jittered by an amount numpy.random.rand()/rate
+            t_start - the beginning of the spike trains (in ms)
+            t_stop  - the end of the spike trains (in ms)
+
+        See also:
+            regular_generator, poisson_population_generator
+        """
+        ids = numpy.asarray(ids, 'float').reshape(-1)
+        rate = numpy.broadcast_to(numpy.asarray(rate, 'float'), ids.shape)
+        phase = numpy.broadcast_to(numpy.asarray(phase, 'float'), ids.shape)
+
+        period = numpy.full(len(ids), numpy.inf)
+        active = rate > 0
+        period[active] = 1000. / rate[active]
+        counts = numpy.zeros(len(ids), 'int')
+        if t_stop > t_start:
+            counts[active] = numpy.ceil((t_stop - t_start) / period[active])
+
+        offsets = numpy.cumsum(counts) - counts
+        k = numpy.arange(counts.sum()) - numpy.repeat(offsets, counts)
+        shift = phase + t_start
+        if jitter:
+            shift = shift + self.rng.rand(len(ids)) * period
+        times = k * numpy.repeat(period, counts) + numpy.repeat(shift, counts)
+
+        spikes = self._population_columns(ids, counts, times)
+        if jitter:
+            #Remove any spikes that extend beyond t_stop
+            spikes = spikes[times < t_stop]
+        return spikes
+
+    def regular_gaussian_population_generator(self, ids, rate, phase=0.0, scale=5., t_start=0.0, t_stop=1000.0):
+        """
+        Returns the spikes of a population of regular spike trains jittered
+        according to a Gaussian distribution around the spiking period, as a
+        columnar (N,2) array of (id, time) pairs, grouped by id in the order of
+        ids and sorted in time within each id. Each row is equivalent to
+        regular_gaussian_generator with the corresponding rate and phase.
+
+        Inputs:
+            ids     - the ids of the neurons
+            rate    - the rate of the discharge (in Hz). Scalar or one per id
+            phase   - Offset the spiketrains by this number (in ms.). Scalar or one per id
+            scale   - width of the Gaussian distribution placed at the regular
+                      spike times, according to which the spike will be drawn (in ms)
+            t_start - the beginning of the spike trains (in ms)
+            t_stop  - the end of the spike trains (in ms)
+
+        See also:
+            regular_gaussian_generator, regular_population_generator
+        """
+        ids = numpy.asarray(ids, 'float').reshape(-1)
+        peaks = self.regular_population_generator(numpy.arange(len(ids)), rate,
+                phase=phase, jitter=False, t_start=t_start, t_stop=t_stop)
+
+        #Some spikes will fall off the starting edge. Get rid of them
+        peaks = peaks[peaks[:, 1] > 0.]
+        times = self.rng.normal(peaks[:, 1], scale)
+        order = numpy.lexsort((times, peaks[:, 0]))
+        counts = numpy.bincount(peaks[:, 0].astype('int'), minlength=len(ids))
+
+        return self._population_columns(ids, counts, times[order])
+
+    def inh_poisson_population_generator(self, ids, rate, t, t_stop, base_generator=None, **base_generator_kwargs):
+        """
+        Returns the spikes of a population of inhomogeneous poisson processes
+        (dynamic rate) as a columnar (N,2) array of (id, time) pairs, grouped
+        by id in the order of ids and sorted in time within each id. Each row
+        is thinned from a base population process at the maximum rate of the
+        neuron, as in inh_poisson_generator.
+
+        Inputs:
+            ids    - the ids of the neurons
+            rate   - a (len(ids), len(t)) array of the rates (Hz) where
+                     rate[n,i] is active on interval [t[i],t[i+1]]
+            t      - an array specifying the time bins (in milliseconds) at which to
+                     specify the rate
+            t_stop - length of time to simulate process (in ms)
+            base_generator - a population generator, defaults to
+                     poisson_population_generator
+
+        Note:
+            t_start=t[0]
+
+        See also:
+            inh_poisson_generator, poisson_population_generator
+        """
+        if base_generator == None:
+            base_generator = self.poisson_population_generator
+
+        ids = numpy.asarray(ids, 'float').reshape(-1)
+        rate = numpy.asarray(rate, 'float')
+        if rate.shape != (len(ids), len(t)):
+            raise ValueError(
+                'shape mismatch: rate must be of shape (len(ids), len(t))')
+
+        # get max rates and generate the processes to be thinned
+        rmax = rate.max(axis=1) if rate.size else numpy.zeros(len(ids))
+        ps = base_generator(numpy.arange(len(ids)), rmax, t_start=t[0],
+                t_stop=t_stop, **base_generator_kwargs)
+        row = ps[:, 0].astype('int')
+
+        # gen uniform rand on 0,1 for each spike
+        rn = numpy.array(self.rng.uniform(0, 1, len(ps)))
+
+        # instantaneous rate for each spike
+        idx = numpy.searchsorted(t, ps[:, 1]) - 1
+        spike_rate = rate[row, idx]
+
+        # thin and return spikes
+        keep = rn * rmax[row] < spike_rate
+        ps = ps[keep]
+        ps[:, 0] = ids[row[keep]]
+        return ps
+
     def _inh_gamma_generator_python(self, a, b, t, t_stop, array=False):
         """
         Returns a SpikeList whose spikes are a realization of an inhomogeneous gamma process
@@ -13,7 +13,8 @@ import pylab
 import matplotlib
 from . import pyST_globals
 from . import STgen as stgen
-from .spikes import SpikeList, SpikeTrain, load, merge, merge_spikelists
+from .spikes import SpikeList, ColumnarSpikeList, SpikeTrain, load, merge, \
+                    merge_spikelists
 
 #Globals
 addrIndex = 0
@@ -8,11 +8,12 @@
 #-----------------------------------------------------------------------------
 from __future__ import absolute_import
 from .STas import events, channelEvents, RawOutput, channelAddressing, addrSpec
+from .STas import aerFile, save_aer, load_aer
 from .STas import setDefaultMonChannelAddress, setDefaultSeqChannelAddress,\
                  getDefaultMonChannelAddress, getDefaultSeqChannelAddress
 from .STsl import STCreate
-from .spikes import SpikeList, SpikeTrain, merge, merge_spikelists, \
-                   merge_sequencers
+from .spikes import SpikeList, ColumnarSpikeList, SpikeTrain, merge, \
+                   merge_spikelists, merge_sequencers
 from . import pyST_globals
 import numpy as np
 
@@ -86,6 +86,53 @@ class SpikeTrain(object):
     def spike_times(self, value):
         self._spike_times = numpy.sort(value).astype(numpy.float)
 
+    # [t_start, t_stop] list of the SpikeList holding the SpikeTrain, see
+    # SpikeList.__setitem__. None if the SpikeTrain has its own time window
+    _window = None
+
+    @property
+    def t_start(self):
+        if self._window is not None:
+            return self._window[0]
+        return self._t_start
+
+    @t_start.setter
+    def t_start(self, t_start):
+        if self._window is not None:
+            if t_start == self._window[0]:
+                return
+            self._detach()
+        self._t_start = t_start
+
+    @property
+    def t_stop(self):
+        if self._window is not None:
+            return self._window[1]
+        return self._t_stop
+
+    @t_stop.setter
+    def t_stop(self, t_stop):
+        if self._window is not None:
+            if t_stop == self._window[1]:
+                return
+            self._detach()
+        self._t_stop = t_stop
+
+    def _detach(self):
+        """
+        Internal function giving the SpikeTrain its own copy of the time
+        window of the SpikeList it belongs to
+        """
+        self._t_start, self._t_stop = self._window
+        self._window = None
+
+    def __setstate__(self, state):
+        # SpikeTrains pickled before the time window could be shared
+        if 't_start' in state:
+            state['_t_start'] = state.pop('t_start')
+            state['_t_stop'] = state.pop('t_stop')
+        self.__dict__.update(state)
+
     #######################################################################
     ## Constructor and key methods to manipulate the SpikeTrain objects  ##
     #######################################################################
@@ -773,6 +820,79 @@ def merge_spikelists(*lspikelist):
     return stStim
 
 
+#######################################################################
+## Population statistics on flat (CSR) spike arrays                  ##
+#######################################################################
+# The spikes of a population are given as a times array grouped by cell
+# and an offsets array, such that the spikes of the i-th cell are
+# times[offsets[i]:offsets[i+1]] (see SpikeList._flat). All the functions
+# below return arrays with one entry per cell.
+
+def _flat_segments(offsets):
+    """
+    Return the cell index of each element of a flat array
+    """
+    return numpy.repeat(numpy.arange(len(offsets) - 1), numpy.diff(offsets))
+
+
+def _flat_counts(offsets, mask):
+    """
+    Return the number of True values of mask for each cell
+    """
+    cumsum = numpy.concatenate(([0], numpy.cumsum(mask)))
+    return cumsum[offsets[1:]] - cumsum[offsets[:-1]]
+
+
+def _flat_window(offsets, times, t_start, t_stop):
+    """
+    Return the (offsets, times) of the spikes with t_start <= t <= t_stop,
+    t_start and t_stop being either scalars or per cell arrays
+    """
+    counts = numpy.diff(offsets)
+    if numpy.ndim(t_start) > 0:
+        t_start = numpy.repeat(t_start, counts)
+    if numpy.ndim(t_stop) > 0:
+        t_stop = numpy.repeat(t_stop, counts)
+    mask = (times >= t_start) & (times <= t_stop)
+    return numpy.concatenate(([0], numpy.cumsum(_flat_counts(offsets, mask)))), times[mask]
+
+
+def _flat_isi(offsets, times):
+    """
+    Return the (offsets, isi) of the inter-spike intervals of each cell
+    """
+    segments = _flat_segments(offsets)
+    isi = numpy.diff(times)[segments[1:] == segments[:-1]]
+    n_isi = numpy.maximum(numpy.diff(offsets) - 1, 0)
+    return numpy.concatenate(([0], numpy.cumsum(n_isi))), isi
+
+
+def _flat_mean_var(offsets, values):
+    """
+    Return the mean and the variance of the values of each cell. Both are NaN
+    for cells without values
+    """
+    N = len(offsets) - 1
+    n = numpy.diff(offsets).astype(numpy.float)
+    segments = _flat_segments(offsets)
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        mean = numpy.bincount(segments, values, minlength=N) / n
+        var = numpy.bincount(segments, (values - mean[segments]) ** 2,
+                             minlength=N) / n
+    return mean, var
+
+
+def _flat_histogram(offsets, times, bins):
+    """
+    Return the (cells, len(bins)-1) matrix of the spike counts of each cell,
+    with the same binning as numpy.histogram
+    """
+    N = len(offsets) - 1
+    hist, xedges, yedges = numpy.histogram2d(
+        _flat_segments(offsets), times, bins=(numpy.arange(N + 1), bins))
+    return hist
+
+
 class SpikeList(object):
     """
     SpikeList(spikes, id_list, t_start=None, t_stop=None, dims=None)
@@ -786,7 +906,9 @@ class SpikeList(object):
         t_stop  - end of the SpikeList, in ms. If None, will be infered from the data
         dims    - dimensions of the recorded population, if not 1D population
 
-    t_start and t_stop are shared for all SpikeTrains object within the SpikeList
+    t_start and t_stop are shared for all SpikeTrains object within the SpikeList:
+    the SpikeTrains reference the time window of the SpikeList, until their own
+    t_start or t_stop are changed.
 
     Examples:
         >> sl = SpikeList([(0, 0.1), (1, 0.1), (0, 0.2)], range(2))
@@ -796,6 +918,9 @@ class SpikeList(object):
     See also
         load_spikelist
     """
+    # Cache of the sorted id_list, see id_list()
+    _id_list = None
+
     #######################################################################
     ## Constructor and key methods to manipulate the SpikeList objects   ##
     #######################################################################
@@ -809,8 +934,7 @@ class SpikeList(object):
         if isinstance(spikes, SpikeList):
             id_list = spikes.id_list()
             spikes = numpy.transpose(spikes.convert("[ids, times]"))
-        self._t_start = t_start
-        self._t_stop = t_stop
+        self._window = [t_start, t_stop]
         self.dimensions = dims
         self.spiketrains = {}
         id_list = numpy.sort(id_list)
@@ -844,28 +968,33 @@ class SpikeList(object):
 
         if len(self) > 0 and (self.t_start is None or self.t_stop is None):
             self.__calc_startstop()
+        else:
+            for st in self.spiketrains.itervalues():
+                st._window = self._window
 
         del spikes
 
     @property
     def t_start(self):
-        return self._t_start
+        return self._window[0]
 
     @t_start.setter
     def t_start(self, t_start):
-        self._t_start = t_start
-        for st in self:
-            st.t_start = t_start
+        self._window[0] = t_start
 
     @property
     def t_stop(self):
-        return self._t_stop
+        return self._window[1]
 
     @t_stop.setter
     def t_stop(self, t_stop):
-        self._t_stop = t_stop
-        for st in self:
-            st.t_stop = t_stop
+        self._window[1] = t_stop
+
+    def __setstate__(self, state):
+        # SpikeLists pickled before the time window could be shared
+        if '_t_start' in state:
+            state['_window'] = [state.pop('_t_start'), state.pop('_t_stop')]
+        self.__dict__.update(state)
 
     def __del__(self):
         pass
@@ -882,12 +1011,18 @@ class SpikeList(object):
         Return the sorted list of all the cells ids contained in the
         SpikeList object
 
+        The returned array is cached until ids are added or removed, and is
+        therefore read-only: use id_list().copy() to get an array that can be
+        modified.
+
         Examples
             >> spklist.id_list()
                 [0,1,2,3,....,9999]
         """
-        #return numpy.array(self.spiketrains.keys(), int)
-        return numpy.array(numpy.sort(self.spiketrains.keys()))
+        if self._id_list is None or len(self._id_list) != len(self.spiketrains):
+            self._id_list = numpy.array(numpy.sort(self.spiketrains.keys()))
+            self._id_list.flags.writeable = False
+        return self._id_list
 
     def copy(self):
         """
@@ -911,23 +1046,21 @@ class SpikeList(object):
             self.t_start = numpy.min(start_times)
             logging.debug("Warning, t_start is infered from the data : %f" %
                 self.t_start)
-            for id in self.spiketrains.keys():
-                self.spiketrains[id].t_start = self.t_start
           #  if self.t_stop is None:
             stop_times = numpy.array([self.spiketrains[idx].
                 t_stop for idx in self.id_list()], numpy.float)
             self.t_stop = numpy.max(stop_times)
             logging.debug(
                 "Warning, t_stop  is infered from the data : %f" % self.t_stop)
-            for id in self.spiketrains.keys():
-                self.spiketrains[id].t_stop = self.t_stop
+            for st in self.spiketrains.itervalues():
+                st._window = self._window
         else:
             raise Exception("No SpikeTrains")
 
     def __getitem__(self, id):
-        if id in self.id_list():
+        try:
             return self.spiketrains[id]
-        else:
+        except KeyError:
             raise Exception(
                 "id %d is not present in the SpikeList. See id_list()" % id)
 
@@ -935,23 +1068,23 @@ class SpikeList(object):
         """
         Return a new SpikeList object with all the ids between i and j
         """
-        ids = numpy.where((self.id_list() >= i) & (self.id_list() < j))[0]
-        return self.id_slice(ids)
+        id_list = self.id_list()
+        return self.id_slice(id_list[(id_list >= i) & (id_list < j)])
 
     #def __setslice__(self, i, j):
 
     def __setitem__(self, id, spktrain):
         assert isinstance(spktrain, SpikeTrain), "A SpikeList object can only contain SpikeTrain objects"
+        if id not in self.spiketrains:
+            self._id_list = None
         self.spiketrains[id] = spktrain
         #self.__calc_startstop()
         if (self.t_start is None) or (spktrain.t_start < self.t_start):
-            for i in self.spiketrains:
-                self.spiketrains[i].t_start = spktrain.t_start
             self.t_start = spktrain.t_start
         if (self.t_stop is None) or (spktrain.t_stop > self.t_stop):
-            for i in self.spiketrains:
-                self.spiketrains[i].t_stop = spktrain.t_stop
             self.t_stop = spktrain.t_stop
+        # The SpikeTrain now follows the time window of the SpikeList
+        spktrain._window = self._window
 
     def __iter__(self):
         return self.spiketrains.itervalues()
@@ -998,9 +1131,10 @@ class SpikeList(object):
             concatenate, __setitem__
         """
         assert isinstance(spktrain, SpikeTrain), "A SpikeList object can only contain SpikeTrain objects"
-        if id in self.id_list():
+        if id in self.spiketrains:
             raise Exception("id %d already present in SpikeList. Use __setitem__ (spk[id]=...) instead()" % id)
         else:
+            self._id_list = None
             self.spiketrains[id] = spktrain #spktrain.time_slice(self.
                 #t_start, self.t_stop)
 
@@ -1064,7 +1198,7 @@ class SpikeList(object):
             concatenate, append, __setitem__
         """
         for id, spiketrain in spikelist.spiketrains.items():
-            if id in self.id_list():
+            if id in self.spiketrains:
                                 # Does not take relative argument, Check
                                 # SpikeList.merge?
                 self.spiketrains[id] = merge(self.spiketrains[id], spiketrain)
@@ -1095,6 +1229,7 @@ class SpikeList(object):
             empty_ST = emptySpikeTrain()
             missing_sts = zip(missing_ids, [empty_ST] * len(missing_ids))
             self.spiketrains.update(missing_sts)
+            self._id_list = None
 
     def id_slice(self, id_list):
         """
@@ -1198,6 +1333,7 @@ class SpikeList(object):
             spk = self.spiketrains.pop(id)
             newspiketrains[id+offset] = spk
         self.spiketrains = newspiketrains
+        self._id_list = None
 
 
     def first_spike_time(self):
@@ -1300,10 +1436,9 @@ class SpikeList(object):
         See also:
             isi_hist
         """
-        isis = []
-        for id in self.id_list():
-            isis.append(self.spiketrains[id].isi())
-        return isis
+        offsets, times, t_starts, t_stops = self._flat()
+        isi_offsets, isi = _flat_isi(offsets, times)
+        return numpy.split(isi, isi_offsets[1:-1])
 
     def isi_hist(self, bins=50, display=False, kwargs={}):
         """
@@ -1356,11 +1491,10 @@ class SpikeList(object):
             cv_isi_hist, cv_local, cv_kl, SpikeTrain.cv_isi
 
         """
-        ids = self.id_list()
-        N = len(ids)
-        cvs_isi = numpy.empty(N)
-        for idx in xrange(N):
-            cvs_isi[idx] = self.spiketrains[ids[idx]].cv_isi()
+        offsets, times, t_starts, t_stops = self._flat()
+        mean, var = _flat_mean_var(*_flat_isi(offsets, times))
+        with numpy.errstate(invalid='ignore', divide='ignore'):
+            cvs_isi = numpy.sqrt(var) / mean
 
         if float_only:
             cvs_isi = numpy.extract(
@@ -1385,18 +1519,27 @@ class SpikeList(object):
             mean_rates, mean_rate_std
         """
         return numpy.mean(self.mean_rates(t_start, t_stop))
+
     def mean_rates_isi(self, t_start=None, t_stop=None):
         '''
-        Returns a list of mean rates calculated on the basis of interspike
-        interval.
+        Returns a vector of the size of id_list giving the mean rates
+        calculated on the basis of interspike interval, 0 for cells with less
+        than two spikes.
         
         If t_start or t_stop are not defined, those of the SpikeList are used
         '''
-        mean_rate = []
-        for id in self.id_list():
-            mean_rate.append(self.spiketrains[id].mean_rate_isi(t_start, 
-                                                                t_stop))
-        return mean_rate
+        offsets, times, t_starts, t_stops = self._flat()
+        if (t_start != None) | (t_stop != None):
+            if t_start != None:
+                t_starts = numpy.maximum(t_starts, t_start)
+            if t_stop != None:
+                t_stops = numpy.minimum(t_stops, t_stop)
+            offsets, times = _flat_window(offsets, times, t_starts, t_stops)
+        mean, var = _flat_mean_var(*_flat_isi(offsets, times))
+        with numpy.errstate(divide='ignore'):
+            rates = 1000. / mean
+        rates[numpy.isnan(mean)] = 0
+        return rates
 
 
     def mean_rate_std(self, t_start=None, t_stop=None):
@@ -1432,10 +1575,16 @@ class SpikeList(object):
         See also
             mean_rate, mean_rate_std
         """
-        rates = []
-        for id in self.id_list():
-            rates.append(self.spiketrains[id].mean_rate(t_start, t_stop))
-        return numpy.array(rates, 'float')
+        offsets, times, t_starts, t_stops = self._flat()
+        if (t_start == None) & (t_stop == None):
+            counts = numpy.diff(offsets)
+        else:
+            if t_start != None:
+                t_starts = numpy.maximum(t_starts, t_start)
+            if t_stop != None:
+                t_stops = numpy.minimum(t_stops, t_stop)
+            counts = numpy.diff(_flat_window(offsets, times, t_starts, t_stops)[0])
+        return 1000. * counts / (t_stops - t_starts)
 
     def rate_distribution(self, nbins=25, normalize=True, display=False, kwargs={}):
         """
@@ -1485,15 +1634,8 @@ class SpikeList(object):
         See also
             firing_rate, time_axis
         """
-        nbins = self.time_axis(time_bin)
-        N = len(self)
-        M = len(nbins)
-        M -= 1
-        spike_hist = numpy.zeros((N, M), numpy.float)
+        spike_hist = self._spike_histogram(time_bin, normalized)
         subplot = get_display(display)
-        for idx, id in enumerate(self.id_list()):
-            s = self.spiketrains[id].time_histogram(time_bin, normalized)
-            spike_hist[idx, :len(s)] = s
         if not subplot or not HAVE_PYLAB:
             return spike_hist
         else:
@@ -1508,6 +1650,30 @@ class SpikeList(object):
             subplot.plot(axis, numpy.mean(spike_hist, axis=0), **kwargs)
             pylab.draw()
 
+    def _spike_histogram(self, time_bin, normalized=False):
+        """
+        Internal function computing the (len(id_list), time bins) histogram
+        matrix returned by spike_histogram
+        """
+        nbins = self.time_axis(time_bin)
+        offsets, times, t_starts, t_stops = self._flat()
+        # SpikeTrains are binned on their own time axis, which is the one of
+        # the SpikeList unless they were given different time parameters
+        silent = numpy.diff(offsets) == 0
+        if numpy.all(silent | ((t_starts == self.t_start) & (t_stops == self.t_stop))):
+            spike_hist = _flat_histogram(offsets, times, nbins)
+            if normalized and isinstance(time_bin, int):
+                spike_hist *= 1000.0 / time_bin
+            return spike_hist
+        N = len(self)
+        M = len(nbins)
+        M -= 1
+        spike_hist = numpy.zeros((N, M), numpy.float)
+        for idx, id in enumerate(self.id_list()):
+            s = self.spiketrains[id].time_histogram(time_bin, normalized)
+            spike_hist[idx, :len(s)] = s
+        return spike_hist
+
     def firing_rate(self, time_bin, display=False, average=False, kwargs={}):
         """
         Generate an array with all the instantaneous firing rates along time (in Hz)
@@ -1551,20 +1717,26 @@ class SpikeList(object):
         fano = numpy.var(firing_rate) / numpy.mean(firing_rate)
         return fano
 
-    def fano_factors_isi(self):
+    def fano_factors_isi(self, float_only=True):
         """
-        Return a list containing the fano factors for each neuron
+        Return the fano factors of the isi of each neuron
+
+        Inputs:
+            float_only - True by default, the neurons without isi are
+                         skipped. If False, the returned vector has the size
+                         of id_list and is NaN for those neurons
 
         See also
             isi, isi_cv
         """
-        fano_factors = []
-        for id in self.id_list():
-            try:
-                fano_factors.append(self.spiketrains[id].fano_factor_isi())
-            except:
-                pass
+        offsets, times, t_starts, t_stops = self._flat()
+        mean, var = _flat_mean_var(*_flat_isi(offsets, times))
+        with numpy.errstate(invalid='ignore', divide='ignore'):
+            fano_factors = var / mean
 
+        if float_only:
+            fano_factors = numpy.extract(
+                numpy.logical_not(numpy.isnan(mean)), fano_factors)
         return fano_factors
 
     def id2position(self, id, offset=0):
@@ -1775,12 +1947,7 @@ class SpikeList(object):
         """
         is_times = re.compile("times")
         is_ids = re.compile("ids")
-        if len(self) > 0:
-            times = numpy.concatenate([st.format(relative, quantized) for st in self.spiketrains.itervalues()])
-            ids = numpy.concatenate([id * numpy.ones(len(st.spike_times), int) for id, st in self.spiketrains.iteritems()])
-        else:
-            times = []
-            ids = []
+        times, ids = self._times_and_ids(relative, quantized)
         if is_times.search(format):
             if is_ids.search(format):
                 return eval(format)
@@ -1814,13 +1981,39 @@ class SpikeList(object):
         See also:
             convert()
         """
+        times, ids = self._times_and_ids()
+        return numpy.column_stack([times,ids])
+
+    def _times_and_ids(self, relative=False, quantized=False):
+        """
+        Internal function returning the flat (times, ids) arrays used by
+        convert and raw_data. See SpikeTrain.format for relative and quantized.
+        """
         if len(self) > 0:
-            times = numpy.concatenate([st.spike_times for st in self.spiketrains.itervalues()])
+            times = numpy.concatenate([st.format(relative, quantized) for st in self.spiketrains.itervalues()])
             ids = numpy.concatenate([id * numpy.ones(len(st.spike_times), int) for id, st in self.spiketrains.iteritems()])
         else:
             times = []
             ids = []
-        return numpy.column_stack([times,ids])
+        return times, ids
+
+    def _flat(self):
+        """
+        Internal function returning the SpikeList as flat arrays aligned to
+        id_list(): (offsets, times, t_starts, t_stops). The spikes of the i-th
+        cell are times[offsets[i]:offsets[i+1]], t_starts and t_stops are the
+        time parameters of its SpikeTrain.
+        """
+        spiketrains = [self.spiketrains[id] for id in self.id_list()]
+        if len(spiketrains) > 0:
+            times = numpy.concatenate([st.spike_times for st in spiketrains])
+        else:
+            times = numpy.array([], numpy.float)
+        counts = [len(st.spike_times) for st in spiketrains]
+        offsets = numpy.concatenate(([0], numpy.cumsum(counts))).astype(int)
+        t_starts = numpy.array([st.t_start for st in spiketrains], numpy.float)
+        t_stops = numpy.array([st.t_stop for st in spiketrains], numpy.float)
+        return offsets, times, t_starts, t_stops
 
     def composite_plot(self, id_list=None, t_start=None, t_stop=None, t_start_rate=None, t_stop_rate=None, display=True, kwargs={}, kwargs_bar={}):
         """
@@ -1872,6 +2065,475 @@ class SpikeList(object):
         return axS, axR
 
 
+class _SpikeTrainViews(dict):
+    """
+    Read-only dictionary of the SpikeTrain views of a ColumnarSpikeList
+    """
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("The spiketrains of a ColumnarSpikeList are read-only, use __setitem__ or append instead")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _read_only
+
+
+class ColumnarSpikeList(SpikeList):
+    """
+    ColumnarSpikeList(spikes, id_list, t_start=None, t_stop=None, dims=None)
+
+    Return a SpikeList object storing the activity of the whole population
+    in flat arrays instead of a dict of SpikeTrain objects:
+
+        id_list() - the sorted ids of all cells
+        times     - all the spike times, grouped by id and sorted within
+                    each id
+        offsets   - a CSR index, the spikes of id_list()[i] are
+                    times[offsets[i]:offsets[i+1]]
+
+    Construction, mean_rates, spike_histogram, time_slice, id_slice, convert
+    and raw_data operate directly on these arrays. SpikeTrain objects are
+    only built when they are requested (__getitem__, iteration or the
+    spiketrains attribute), as views on the times array.
+
+    Inputs are the same as for SpikeList, and so is the handling of t_start
+    and t_stop. All the SpikeTrains share the t_start and t_stop of the
+    ColumnarSpikeList.
+
+    Examples:
+        >> sl = ColumnarSpikeList([(0, 0.1), (1, 0.1), (0, 0.2)], range(2))
+        >> sl.mean_rates()
+            array([ 20000.,  10000.])
+        >> type( sl[0] )
+            <type SpikeTrain>
+
+    See also
+        SpikeList
+    """
+    def __init__(self, spikes=[], id_list=[], t_start=None, t_stop=None, dims=None):
+        """
+        Constructor of the ColumnarSpikeList object
+
+        See also
+            ColumnarSpikeList, SpikeList
+        """
+        if isinstance(spikes, SpikeList):
+            id_list = spikes.id_list()
+            spikes = numpy.transpose(spikes.convert("[ids, times]"))
+        self._window = [t_start, t_stop]
+        self.dimensions = dims
+        self._ids = numpy.unique(id_list)
+
+        spikes = numpy.asarray(spikes, 'float').reshape(-1, 2)
+        ids = spikes[:, 0]
+        times = spikes[:, 1]
+        # Population generators already emit spikes grouped by id and sorted
+        # in time, in which case membership is checked per id and the sort
+        # is skipped
+        grouped = (numpy.diff(ids) >= 0).all()
+        if grouped and len(ids) == (numpy.searchsorted(ids, self._ids, 'right') -
+                                    numpy.searchsorted(ids, self._ids, 'left')).sum():
+            keep = numpy.ones(len(ids), 'bool')
+        else:
+            pos = numpy.searchsorted(self._ids, ids)
+            keep = pos < len(self._ids)
+            keep[keep] = self._ids[pos[keep]] == ids[keep]
+        if t_start is not None:
+            keep &= (times >= t_start)
+        if t_stop is not None:
+            keep &= (times <= t_stop)
+        if not keep.all():
+            ids = ids[keep]
+            times = times[keep]
+        if len(times) > 0 and numpy.min(times) < 0:
+            raise ValueError("Spike times must not be negative")
+
+        if grouped and ((numpy.diff(ids) > 0) | (numpy.diff(times) >= 0)).all():
+            times = times.copy()
+        else:
+            order = numpy.lexsort((times, ids))
+            ids = ids[order]
+            times = times[order]
+        self._set_flat(self._ids, ids, times)
+
+        if len(self) > 0 and (self.t_start is None or self.t_stop is None):
+            self._infer_startstop()
+
+    @classmethod
+    def _from_flat(cls, ids, offsets, times, t_start, t_stop, dims=None):
+        """
+        Internal constructor from already grouped and sorted flat arrays
+        """
+        spklist = cls.__new__(cls)
+        spklist._window = [t_start, t_stop]
+        spklist.dimensions = dims
+        spklist._ids = ids
+        spklist._offsets = offsets
+        spklist._times = times
+        spklist._invalidate()
+        return spklist
+
+    def _set_flat(self, id_list, ids, times):
+        """
+        Internal function storing the spikes given by ids and times, which
+        must be sorted by (id, time) and contained in id_list.
+        """
+        self._ids = numpy.unique(id_list)
+        self._times = numpy.asarray(times, 'float')
+        self._offsets = numpy.concatenate((
+            numpy.searchsorted(ids, self._ids, side='left'),
+            [len(ids)]))
+        self._invalidate()
+
+    def _invalidate(self):
+        self._ids.flags.writeable = False
+        self._views = _SpikeTrainViews()
+        self._views_complete = False
+
+    def _counts(self):
+        """
+        Number of spikes of each id of id_list()
+        """
+        return numpy.diff(self._offsets)
+
+    def _spike_ids(self):
+        """
+        Id of each spike in the times array
+        """
+        return numpy.repeat(self._ids, self._counts())
+
+    def _infer_startstop(self):
+        """
+        Infer the missing t_start and/or t_stop from the data, in the same way
+        SpikeList does from the inferred windows of its SpikeTrains.
+        """
+        counts = self._counts()
+        full = counts > 0
+        first = self._times[self._offsets[:-1][full]]
+        last = self._times[self._offsets[1:][full] - 1]
+        if self.t_start is None:
+            starts = first
+        else:
+            starts = numpy.repeat(float(self.t_start), len(first))
+        if self.t_stop is None:
+            stops = numpy.where(counts[full] == 1, first + 0.1, last)
+        else:
+            stops = numpy.repeat(float(self.t_stop), len(first))
+        stops = numpy.where(stops == starts, starts + 1., stops)
+        # Silent cells are emptySpikeTrains
+        if not numpy.all(full):
+            empty_ST = emptySpikeTrain()
+            starts = numpy.concatenate((starts, [empty_ST.t_start]))
+            stops = numpy.concatenate((stops, [empty_ST.t_stop]))
+        self.t_start = numpy.min(starts)
+        logging.debug("Warning, t_start is infered from the data : %f" %
+            self.t_start)
+        self.t_stop = numpy.max(stops)
+        logging.debug(
+            "Warning, t_stop  is infered from the data : %f" % self.t_stop)
+
+    def _index(self, id):
+        """
+        Position of id in id_list(), or None if it is not present
+        """
+        idx = numpy.searchsorted(self._ids, id)
+        if idx < len(self._ids) and self._ids[idx] == id:
+            return idx
+        return None
+
+    def _view(self, idx):
+        """
+        Return the SpikeTrain of id_list()[idx], sharing its spike times with
+        the ColumnarSpikeList
+        """
+        id = self._ids[idx]
+        st = self._views.get(id)
+        if st is None:
+            o0, o1 = self._offsets[idx], self._offsets[idx + 1]
+            if o0 == o1:
+                st = emptySpikeTrain()
+            else:
+                st = SpikeTrain(self._times[o0:o1], presorted=True)
+            st._window = self._window
+            dict.__setitem__(self._views, id, st)
+        return st
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_views'] = _SpikeTrainViews()
+        state['_views_complete'] = False
+        return state
+
+    @property
+    def spiketrains(self):
+        """
+        Read-only dictionary of the SpikeTrain views, built on first access.
+        Use __setitem__ or append to change the ColumnarSpikeList.
+        """
+        if not self._views_complete:
+            for idx in xrange(len(self._ids)):
+                self._view(idx)
+            self._views_complete = True
+        return self._views
+
+    def id_list(self):
+        """
+        Return the sorted list of all the cells ids contained in the
+        SpikeList object
+
+        The returned array is read-only: use id_list().copy() to get an array
+        that can be modified.
+
+        Examples
+            >> spklist.id_list()
+                [0,1,2,3,....,9999]
+        """
+        return self._ids
+
+    def copy(self):
+        """
+        Return a copy of the ColumnarSpikeList object
+        """
+        return self._from_flat(self._ids.copy(), self._offsets.copy(),
+                               self._times.copy(), self.t_start, self.t_stop,
+                               self.dimensions)
+
+    def __getitem__(self, id):
+        idx = self._index(id)
+        if idx is None:
+            raise Exception(
+                "id %d is not present in the SpikeList. See id_list()" % id)
+        return self._view(idx)
+
+    def __setitem__(self, id, spktrain):
+        assert isinstance(spktrain, SpikeTrain), "A SpikeList object can only contain SpikeTrain objects"
+        self._insert(id, spktrain.spike_times)
+        if (self.t_start is None) or (spktrain.t_start < self.t_start):
+            self.t_start = spktrain.t_start
+        if (self.t_stop is None) or (spktrain.t_stop > self.t_stop):
+            self.t_stop = spktrain.t_stop
+
+    def __iter__(self):
+        for idx in xrange(len(self._ids)):
+            yield self._view(idx)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _insert(self, id, spike_times):
+        """
+        Internal function replacing (or inserting) the spikes of id
+        """
+        idx = self._index(id)
+        if idx is not None:
+            o0, o1 = self._offsets[idx], self._offsets[idx + 1]
+            offsets = self._offsets.copy()
+        else:
+            idx = numpy.searchsorted(self._ids, id)
+            o0 = o1 = self._offsets[idx]
+            self._ids = numpy.insert(
+                self._ids.astype(numpy.result_type(self._ids, id)), idx, id)
+            offsets = numpy.insert(self._offsets, idx, o0)
+        offsets[idx + 1:] += len(spike_times) - (o1 - o0)
+        self._times = numpy.concatenate(
+            (self._times[:o0], spike_times, self._times[o1:]))
+        self._offsets = offsets
+        self._invalidate()
+
+    def _add_spiketrains(self, id_list, spiketrains):
+        """
+        Internal function adding all the spikes of spiketrains (one for each
+        id in id_list) to the flat arrays, with a single sort.
+        """
+        times = [self._times] + [st.spike_times for st in spiketrains]
+        ids = [self._spike_ids()] + [numpy.repeat(id, len(st.spike_times))
+                                     for id, st in zip(id_list, spiketrains)]
+        times = numpy.concatenate(times)
+        ids = numpy.concatenate(ids)
+        order = numpy.lexsort((times, ids))
+        self._set_flat(numpy.union1d(self._ids, id_list), ids[order], times[order])
+
+    def append(self, id, spktrain):
+        """
+        Add a SpikeTrain object to the SpikeList
+
+        Inputs:
+            id       - the id of the new cell
+            spktrain - the SpikeTrain object representing the new cell
+
+        See also
+            SpikeList.append, concatenate, __setitem__
+        """
+        assert isinstance(spktrain, SpikeTrain), "A SpikeList object can only contain SpikeTrain objects"
+        if self._index(id) is not None:
+            raise Exception("id %d already present in SpikeList. Use __setitem__ (spk[id]=...) instead()" % id)
+        self._insert(id, spktrain.spike_times)
+
+    def concatenate(self, spklists):
+        """
+        Concatenation of SpikeLists to the current SpikeList.
+
+        Inputs:
+            spklists - could be a single SpikeList or a list of SpikeLists
+
+        See also
+            SpikeList.concatenate, append, merge
+        """
+        if isinstance(spklists, SpikeList):
+            spklists = [spklists]
+        for sl in spklists:
+            if not sl.time_parameters() == self.time_parameters():
+                raise Exception("Spike Lists should have similar time_axis")
+        id_list = numpy.concatenate(
+            [self._ids] + [sl.id_list() for sl in spklists])
+        unique_ids, counts = numpy.unique(id_list, return_counts=True)
+        if numpy.any(counts > 1):
+            raise Exception("id %d already present in SpikeList. Use __setitem__ (spk[id]=...) instead()" % unique_ids[counts > 1][0])
+        self._add_spiketrains(id_list[len(self._ids):],
+                              [st for sl in spklists for st in
+                               (sl[id] for id in sl.id_list())])
+
+    def merge(self, spikelist, relative=False):
+        """
+        For each cell id in spikelist that matches an id in this SpikeList,
+        merge the two SpikeTrains and save the result in this SpikeList.
+        Note that SpikeTrains with ids not in this SpikeList are appended to it.
+
+        Inputs:
+            spikelist - the SpikeList that should be merged to the current one
+            relative  - if True, spike times are expressed in a relative
+                        time compared to the previsous one
+
+        See also:
+            SpikeList.merge, concatenate, append
+        """
+        id_list = spikelist.id_list()
+        spiketrains = [spikelist[id] for id in id_list]
+        if relative:
+            for id, spiketrain in zip(id_list, spiketrains):
+                if self._index(id) is None:
+                    spiketrain.relative_times()
+        self._add_spiketrains(id_list, spiketrains)
+
+    def complete(self, id_list):
+        """
+        Complete the SpikeList by adding empty SpikeTrains for all the ids
+        present in id_list that are not already in the SpikeList
+
+        See also
+            SpikeList.complete
+        """
+        ids = numpy.union1d(self._ids, id_list)
+        if len(ids) > len(self._ids):
+            counts = numpy.zeros(len(ids), int)
+            counts[numpy.searchsorted(ids, self._ids)] = self._counts()
+            self._ids = ids
+            self._offsets = numpy.concatenate(([0], numpy.cumsum(counts)))
+            self._invalidate()
+
+    def filter_duplicates(self, time_window = .01):
+        segments = _flat_segments(self._offsets)
+        dup = (numpy.diff(self._times) < time_window) & (segments[1:] == segments[:-1])
+        keep = numpy.concatenate((~dup, [True]))
+        self._offsets = numpy.concatenate(([0], numpy.cumsum(_flat_counts(self._offsets, keep))))
+        self._times = self._times[keep]
+        self._invalidate()
+
+    def id_slice(self, id_list):
+        """
+        Return a new ColumnarSpikeList obtained by selecting particular ids
+
+        Inputs:
+            id_list - a sublist of the current ids, ids that are not present
+                      are ignored
+
+        The new SpikeList inherits the time parameters (t_start, t_stop)
+
+        See also
+            time_slice
+        """
+        if id_list is None:
+            id_list = self._ids
+        elif not hasattr(id_list, '__iter__'):
+            id_list = [id_list]
+        idx = numpy.nonzero(numpy.in1d(self._ids, id_list))[0]
+        starts = self._offsets[idx]
+        counts = self._offsets[idx + 1] - starts
+        offsets = numpy.concatenate(([0], numpy.cumsum(counts)))
+        gather = numpy.arange(offsets[-1]) - numpy.repeat(offsets[:-1] - starts, counts)
+        return self._from_flat(self._ids[idx], offsets, self._times[gather],
+                               self.t_start, self.t_stop, self.dimensions)
+
+    def time_slice(self, t_start, t_stop):
+        """
+        Return a new ColumnarSpikeList obtained by slicing between t_start
+        and t_stop
+
+        Inputs:
+            t_start - begining of the new SpikeTrain, in ms.
+            t_stop  - end of the new SpikeTrain, in ms.
+
+        See also
+            id_slice
+        """
+        if len(self) == 0:
+            raise Exception("No SpikeTrains")
+        offsets, times = _flat_window(self._offsets, self._times, t_start, t_stop)
+        return self._from_flat(self._ids.copy(), offsets, times,
+                               t_start, t_stop, self.dimensions)
+
+    def time_offset(self, offset=None, t_start=None, t_stop=None):
+        """
+        Add an offset to the whole SpikeList object. t_start and t_stop are
+        shifted from offset, so does all the spike times.
+
+        Returns None: changes to the SpikeList are made in-place
+
+        See also
+            SpikeList.time_offset
+        """
+        if offset == None:
+            return
+
+        if t_start == None:
+            self.t_start += offset
+        else:
+            self.t_start = t_start
+
+        if t_stop == None:
+            self.t_stop += offset
+        else:
+            self.t_stop = t_stop
+
+        self._times = self._times + offset
+        self._invalidate()
+
+    def id_offset(self, offset):
+        """
+        Add an offset to the whole SpikeList object. All the id are shifted
+        according to an offset value.
+
+        See also
+            SpikeList.id_offset
+        """
+        self._ids = self._ids + offset
+        self._invalidate()
+
+    def _flat(self):
+        N = len(self)
+        return (self._offsets, self._times,
+                numpy.repeat(self.t_start, N).astype(numpy.float),
+                numpy.repeat(self.t_stop, N).astype(numpy.float))
+
+    def _times_and_ids(self, relative=False, quantized=False):
+        times = self._times.copy()
+        if relative and len(times) > 0:
+            times[1:] = times[1:] - self._times[:-1]
+            firsts = self._offsets[:-1][self._counts() > 0]
+            times[firsts] = self._times[firsts]
+        if quantized:
+            assert quantized > 0, "quantized must either be False or a positive number"
+            times = (times / quantized).round().astype('int')
+        return times, self._spike_ids()
+
+
 def set_axis_limits(subplot, xmin, xmax, ymin, ymax):
     """
     Defines the axis limits of a plot.
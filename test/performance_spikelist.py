@@ -0,0 +1,35 @@
+import pyNCSre.pyST as pyST
+import numpy as np
+import time
+
+# Micro-benchmark of SpikeList slicing: time_slice and id_slice should scale
+# linearly with the number of ids (10 spikes per id). Run it as a script, it
+# is not part of the unit tests.
+
+def bench(f, repeat=3):
+    best = np.inf
+    for i in range(repeat):
+        t0 = time.time()
+        f()
+        best = min(best, time.time() - t0)
+    return best
+
+sizes = [1000, 10000, 100000]
+
+for cls in [pyST.SpikeList, pyST.ColumnarSpikeList]:
+    per_id = {}
+    for n in sizes:
+        ad = np.repeat(np.arange(n), 10)
+        tm = np.random.uniform(0, 1000, len(ad))
+        sl = cls(np.column_stack([ad, tm]), range(n))
+        t_time = bench(lambda: sl.time_slice(250, 750))
+        t_id = bench(lambda: sl.id_slice(range(0, n, 2)))
+        per_id[n] = (t_time / n, t_id / n)
+        print '{0} {1:>7} ids: time_slice {2:.4f}s id_slice {3:.4f}s'.format(
+            cls.__name__, n, t_time, t_id)
+
+    #time per id should not grow with the number of ids
+    for k, name in enumerate(['time_slice', 'id_slice']):
+        ratio = per_id[sizes[-1]][k] / per_id[sizes[0]][k]
+        print '{0} {1}: time per id at {2} ids is {3:.2f}x the one at {4} ids'.format(
+            cls.__name__, name, sizes[-1], ratio, sizes[0])
@@ -18,8 +18,9 @@ def create_default_population(setup,chipname='seq',N=10,*args,**kwargs):
     '''
     Creates a default population
     '''
+    neurontype = kwargs.pop('neurontype', 'excitatory')
     test_pops = pyNCS.Population('default', 'Default Population') 
-    test_pops.populate_by_number(setup, chipname, 'excitatory', N, *args, **kwargs)
+    test_pops.populate_by_number(setup, chipname, neurontype, N, *args, **kwargs)
     return test_pops
 
 def evs_loopback(nsetup, sequencer):
@@ -176,6 +177,102 @@ class TestSequenceFunctions(unittest.TestCase):
         for j in xrange(len(s)):   
             print j      
             m.connect(s.soma[j], t.synapses['inhibitory'][(j*2):((j+1)*2)], fashion = 'by_boolean_matrix', fashion_kwargs={'connection': M[[j],:]})        
+
+    def testMappingMerge(self):
+        m=pyNCS.PMapping('')
+        m.extend([[1, 2], [3, 4]])
+        m2=pyNCS.Mapping('')
+        m2.extend([[3, 4], [5, 6]])
+        m.merge(m2, unique=True)
+        self.assertEqual(m.mapping, [[1, 2, 127], [3, 4, 127], [5, 6, 127]])
+        self.assertEqual(m.mapping_array().dtype, np.uint32)
+        m2.merge(m)
+        self.assertEqual(m2.mapping_array().shape, (5, 2))
+        m2.remove_duplicates()
+        self.assertEqual(m2.mapping, [[3, 4], [5, 6], [1, 2]])
+        #The mapping list writes through to the table
+        m2.mapping.append([7, 8])
+        m2.mapping += [[9, 10]]
+        self.assertEqual(m2.mapping_array().tolist()[-2:], [[7, 8], [9, 10]])
+        m3=pyNCS.Mapping('')
+        m3.extend([[1, 2, 5]])
+        m3.merge(m2)
+        self.assertEqual(m3.mapping[:2], [[1, 2], [3, 4]])
+
+    def testMappingFashions(self):
+        m=pyNCS.Mapping('')
+        src, dst = range(10, 40), range(100, 130)
+        c=m.__connect_one2one__(src, dst)
+        self.assertEqual(c.tolist(), map(list, zip(src, dst)))
+        c=m.__connect_all2all__(src, dst)
+        self.assertEqual(len(set(map(tuple, c))), 900)
+        c=m.__connect_random_all2all__(src, dst, p=0.1)
+        self.assertEqual(len(set(map(tuple, c))), len(c))
+        c=m.__connect_shuffle_all2all__(src, dst, p=0.2)
+        self.assertTrue(np.all(np.bincount(c[:, 1] - 100) == 6))
+
+    def testPrepareUnchangedMapping(self):
+        calls = []
+        prepare = self.nsetup.mapping.prepare
+        self.nsetup.mapping.prepare = lambda: calls.append(prepare())
+        m = pyNCS.Mapping('')
+        m.extend([[1, 2], [3, 4]])
+        self.nsetup.mapping.merge(m)
+        self.nsetup.prepare()
+        self.nsetup.prepare()
+        self.assertEqual(len(calls), 1)
+        self.nsetup.mapping.merge(m)
+        self.nsetup.prepare()
+        self.assertEqual(len(calls), 2)
+        self.assertFalse(self.nsetup.mapping.dirty)
+
+    def testMappingUpload(self):
+        from pyNCS.api.ConfAPI import MappingsBase
+        class Mapper(MappingsBase):
+            def __init__(self):
+                MappingsBase.__init__(self)
+                self.table, self.calls = [], []
+            def add_mappings(self, mappings):
+                self.calls.append('add')
+                self.table += np.asarray(mappings).tolist()
+            def clear_mappings(self):
+                self.calls.append('clear')
+                self.table = []
+            def remove_mappings(self, mappings):
+                self.calls.append('remove')
+                for m in np.asarray(mappings).tolist():
+                    self.table.remove(m)
+        mapper = Mapper()
+        m = pyNCS.Mapping('')
+        m.extend([[1, 2], [3, 4], [3, 4]])
+        m.upload(mapper)
+        m.extend([[5, 6]])
+        m.upload(mapper)
+        m.remove_duplicates()
+        m.upload(mapper)
+        self.assertEqual(mapper.calls, ['clear', 'add', 'add', 'remove'])
+        self.assertEqual(sorted(mapper.table), m.mapping)
+        #The mapper was modified by another Mapping or directly
+        m2 = pyNCS.Mapping('')
+        m2.extend([[5, 6]])
+        m2.upload(mapper)
+        m.upload(mapper)
+        self.assertEqual(sorted(mapper.table), m.mapping)
+        mapper.set_mappings([[7, 8]])
+        m.upload(mapper)
+        self.assertEqual(sorted(mapper.table), m.mapping)
+
+    def testMappingCSR(self):
+        m=pyNCS.Mapping('')
+        m.mapping.extend([[2, 4], [1, 2], [1, 3]])
+        sources, offsets, targets = m.mapping_csr()
+        self.assertEqual(sources.tolist(), [1, 2])
+        self.assertEqual(offsets.tolist(), [0, 2, 3])
+        self.assertEqual(targets.tolist(), [2, 3, 4])
+        #Cached until the mapping table changes
+        self.assertTrue(m.mapping_csr()[0] is sources)
+        m.mapping.append([3, 5])
+        self.assertEqual(m.mapping_csr()[0].tolist(), [1, 2, 3])
         
 
     def testSeqPopulationFunctions(self):
@@ -202,6 +299,31 @@ class TestSequenceFunctions(unittest.TestCase):
         for a in testaddr:
             self.assertTrue(a in pop.soma.paddr)
 
+    def testPopulationSynapses(self):
+        N=5
+        test_pops=create_default_population(self.nsetup,'dynapse_u0',N,neurontype='neuron')
+        for b in test_pops.neuronblock.synapses.values():
+            n_syn=np.prod([len(v) for v in b.dims.values()])
+            syn_addr=test_pops.synapses[b.id].addr.reshape(N, n_syn)
+            self.assertEqual(len(test_pops.synapses[b.id]), N*n_syn)
+            for fld in test_pops.soma.addr.dtype.names:
+                if fld not in b.dims:
+                    self.assertTrue(np.all(syn_addr[fld].T==test_pops.soma.addr[fld]))
+
+    def testGroupSlicing(self):
+        N=10
+        test_pops=create_default_population(self.nsetup,'dynapse_u0',N,neurontype='neuron')
+        paddr=test_pops.soma.paddr.copy()
+        laddr=test_pops.soma.laddr.copy()
+        for i in [3, -1, slice(2,7), [1,4,5]]:
+            g=test_pops.soma[i]
+            self.assertTrue(np.all(g.paddr==np.atleast_1d(paddr[i])))
+            self.assertTrue(np.all(g.laddr==np.atleast_1d(laddr[i])))
+            g.repopulate()
+            self.assertTrue(np.all(g.paddr==np.atleast_1d(paddr[i])))
+            self.assertTrue(np.all(g.laddr==np.atleast_1d(laddr[i])))
+        self.assertEqual(len(list(test_pops.soma)), N)
+
     def testComAPI_RecordableCommunicatorBase(self):
         import pyNCS.api.ComAPI, os
         rec_com = pyNCS.ComAPI.RecordableCommunicatorBase()
@@ -245,6 +367,24 @@ class TestSequenceFunctions(unittest.TestCase):
 
 
 
+    def testStream(self):
+        from pyNCS.api.loopbackAPI import ContinuousCommunicator
+        test_pops=create_default_population(self.nsetup,'dynapse_u0', N=5, neurontype='neuron')
+        stmon1=pyNCS.monitors.SpikeMonitor(test_pops.soma)
+        self.nsetup.monitors.import_monitors([stmon1])
+        self.nsetup.communicator = ContinuousCommunicator()
+        for i in range(3):
+            mon = test_pops.soma.spiketrains_regular(100, t_start=i*1000, duration=1000)
+            evs = self.nsetup.mon.exportAER(mon, isi=False)
+            self.nsetup.communicator.queue.appendleft(evs.get_adtmev())
+        n_evs = []
+        for out in self.nsetup.stream(n_packets=3, history=1500):
+            n_evs.append(len(stmon1.sl.raw_data()))
+        #Monitors accumulate packets, but only keep the last 1500ms
+        self.assertTrue(n_evs[1] > n_evs[0])
+        self.assertTrue(n_evs[2] < n_evs[1])
+        self.assertTrue(stmon1.sl.t_stop - stmon1.sl.t_start <= 1500)
+
     def tearDown(self):
         del self.nsetup
 
@@ -1,5 +1,5 @@
 from pyNCS.pyST import *
-from pyNCS.pyST.STas import load_stas_from_csv, addrLogicalExtract, addrLogicalConstruct, addrPhysicalConstruct, addrPhysicalExtract, addrBuildHashTable
+from pyNCS.pyST.STas import load_stas_from_csv, addrLogicalExtract, addrLogicalConstruct, addrPhysicalConstruct, addrPhysicalExtract, addrBuildHashTable, addrBuildLUT, isValidAddress, _buildGrid
 import unittest
 import numpy as np
 import copy
@@ -77,6 +77,31 @@ class TestSequenceFunctions(unittest.TestCase):
         evs.add_adtmev([[100,100],[100,100]])
         events(evs)
 
+    def testEvents_reserve(self):
+        evs = events()
+        evs.reserve(100)
+        self.assertEqual(evs.capacity(), 100)
+        packets = [np.column_stack([np.arange(30), np.arange(30) + 30 * i]) for i in range(10)]
+        for p in packets:
+            evs.add_adtmev(p)
+        self.assertEqual(len(evs), 300)
+        self.assertTrue(evs.capacity() >= 300)
+        self.assertTrue(np.all(evs.get_adtmev() == np.concatenate(packets)))
+        #Copies do not share the buffer
+        evs2 = events(evs)
+        evs2.add_adtm([1], [1])
+        self.assertEqual(len(evs), 300)
+
+
+    def testEvents_filter_by_mapping(self):
+        mapping = {1:[10,11], 3:[30], 2:[]}
+        evs = events([[1,100],[2,150],[3,200],[4,250],[1,300]])
+        evs.filter_by_mapping(mapping)
+        self.assertEqual(evs.get_adtmev().tolist(), [[10,100],[11,100],[30,200],[10,300],[11,300]])
+        #Compressed sparse row format
+        evs_csr = events([[1,100],[2,150],[3,200],[4,250],[1,300]])
+        evs_csr.filter_by_mapping((np.array([1,2,3]), np.array([0,2,2,3]), np.array([10,11,30])))
+        self.assert_(np.all(evs_csr.data == evs.data))
 
     def testStas(self):
         a=addrPhysicalExtract(\
@@ -285,6 +310,24 @@ class TestSequenceFunctions(unittest.TestCase):
         st=self.STcsSeq.generateST(events_imported,normalize=True)
         self.assert_(np.any([st[0].t_start==0,st[1].t_start==0]))
 
+    def testExportAEREncoding(self):
+        #Addresses are translated per id, check against per event translation
+        ev = self.STcsSeq.exportAER(self.ch_events, isi=False).get_adtmev()
+        expected = []
+        for ch, sl in self.ch_events.iteritems():
+            rd = sl.raw_data()
+            expected.append(np.column_stack([
+                self.STcsSeq[ch].addrLogicalPhysical(rd[:, 1]) + self.STcsSeq.getValue(ch),
+                rd[:, 0] * 1000]).astype('uint32'))
+        expected = np.concatenate(expected)
+        #Channels are multiplexed in time
+        self.assertTrue(np.all(np.diff(ev[:, 1].astype('int')) >= 0))
+        ev_isi = self.STcsSeq.exportAER(self.ch_events, isi=True).get_adtmev()
+        self.assertTrue(np.all(np.cumsum(ev_isi[:, 1]) == ev[:, 1]))
+        ev = ev[np.lexsort((ev[:, 0], ev[:, 1]))]
+        expected = expected[np.lexsort((expected[:, 0], expected[:, 1]))]
+        self.assertTrue(np.all(ev == expected))
+
     def testNoEventsExport(self):
         addrHR=[range(10),5,1]
         addr=self.STcsMon.addrLogicalConstruct({0:addrHR})[0]
@@ -371,6 +414,89 @@ class TestSequenceFunctions(unittest.TestCase):
             for c in range(2): 
                 self.assertAlmostEquals(a[c], sl2.raw_data()[i][c], 3)
 
+    def testColumnarSpikeList(self):
+        spikes = np.column_stack([np.random.randint(0, 20, 2000),
+                                  np.random.uniform(0, 1000, 2000)])
+        sl = SpikeList(spikes, range(25))
+        csl = ColumnarSpikeList(spikes, range(25))
+        self.assertEqual(sl.time_parameters(), csl.time_parameters())
+        self.assertTrue(np.all(sl.id_list() == csl.id_list()))
+        self.assertTrue(np.allclose(sl.mean_rates(), csl.mean_rates()))
+        self.assertTrue(np.allclose(sl.mean_rates(100, 500), csl.mean_rates(100, 500)))
+        self.assertTrue(np.allclose(sl.spike_histogram(10), csl.spike_histogram(10)))
+        for i in sl.id_list():
+            self.assertTrue(np.all(sl[i].spike_times == csl[i].spike_times))
+        sl2 = sl.time_slice(200, 400).id_slice(range(5, 15))
+        csl2 = csl.time_slice(200, 400).id_slice(range(5, 15))
+        self.assertEqual(sl2.time_parameters(), csl2.time_parameters())
+        self.assertTrue(np.allclose(sl2.mean_rates(), csl2.mean_rates()))
+        self.assertEqual(len(sl2.raw_data()), len(csl2.raw_data()))
+        #Spikes at t_stop are kept, as in SpikeList
+        sl = SpikeList([(0, 1.), (0, 10.)], [0], 0, 10)
+        csl = ColumnarSpikeList([(0, 1.), (0, 10.)], [0], 0, 10)
+        self.assertTrue(np.all(sl.raw_data() == csl.raw_data()))
+        self.assertRaises(TypeError, csl.spiketrains.__setitem__, 0, csl[0])
+
+    def testSpikeList_population_stats(self):
+        spikes = np.column_stack([np.random.randint(0, 20, 2000),
+                                  np.random.uniform(0, 1000, 2000)])
+        for sl in [SpikeList(spikes, range(25)), ColumnarSpikeList(spikes, range(25))]:
+            ids = sl.id_list()
+            cvs = sl.cv_isi()
+            rates_isi = sl.mean_rates_isi()
+            isis = sl.isi()
+            self.assertEqual(len(cvs), len(ids))
+            self.assertEqual(len(sl.fano_factors_isi(float_only=False)), len(ids))
+            for i, id in enumerate(ids):
+                st = sl[id]
+                self.assertTrue(np.allclose(isis[i], st.isi()))
+                self.assertAlmostEqual(rates_isi[i], st.mean_rate_isi())
+                if len(st) > 1:
+                    self.assertAlmostEqual(cvs[i], st.cv_isi())
+                else:
+                    self.assertTrue(np.isnan(cvs[i]))
+
+    def testPopulationGenerators(self):
+        ids = np.arange(100, 300)
+        for spikes in [STCreate.poisson_population_generator(ids, 100, 200, 1200),
+                       STCreate.regular_population_generator(ids, 100, t_start=200, t_stop=1200),
+                       STCreate.regular_gaussian_population_generator(ids, 100, t_start=200, t_stop=1200)]:
+            #Grouped by id, sorted in time within each id
+            order = np.lexsort((spikes[:, 1], spikes[:, 0]))
+            self.assertTrue(np.all(order == np.arange(len(spikes))))
+            sl = ColumnarSpikeList(spikes, ids, 200, 1200)
+            self.assertEqual(sl.time_parameters(), (200, 1200))
+            self.assertTrue(np.all(sl.id_list() == ids))
+            self.assertTrue(abs(sl.mean_rate() - 100) < 5)
+        #Regular trains match the single train generator
+        spikes = STCreate.regular_population_generator([1, 2], [50, 0], phase=3., jitter=False)
+        self.assertTrue(np.allclose(spikes[:, 1], STCreate.regular_generator(50, phase=3., jitter=False, array=True)))
+        self.assertTrue(np.all(spikes[:, 0] == 1))
+        #Thinning keeps the spikes in the active bins only
+        t = np.arange(0, 1001, 100.)
+        rate = np.zeros((len(ids), len(t)))
+        rate[:, :5] = 100
+        spikes = STCreate.inh_poisson_population_generator(ids, rate, t, t[-1])
+        self.assertTrue(len(spikes) > 0 and np.all(spikes[:, 1] < 500))
+
+    def testSpikeList_setitem_window(self):
+        sl = SpikeList([], id_list=[])
+        for i in range(100):
+            sl[i] = SpikeTrain(np.arange(0, 100, 10.), t_start=10 - i % 10, t_stop=100 + i)
+        self.assertEqual(sl.time_parameters(), (1, 199))
+        #All the SpikeTrains follow the time window of the SpikeList
+        self.assertTrue(all(st.time_parameters() == (1, 199) for st in sl))
+        sl.t_stop = 300
+        self.assertEqual(sl[0].time_parameters(), (1, 300))
+        sl.time_offset(10)
+        self.assertEqual(sl[50].time_parameters(), (11, 310))
+        self.assertEqual(sl[50].spike_times[0], 20)
+        #A SpikeTrain whose window is set explicitly keeps it
+        sl[3].t_start = 50
+        sl.t_start = 0
+        self.assertEqual(sl[3].time_parameters(), (50, 310))
+        self.assertEqual(sl[4].time_parameters(), (0, 310))
+
 
     def testHashTable(self):
         addrHR=[range(64)]
@@ -387,6 +513,105 @@ class TestSequenceFunctions(unittest.TestCase):
 
 
 
+    def testAddrLUT(self):
+        addrHR=[range(64)]
+        stas=self.STcsMon[1]
+        addrPhys=stas.addrPhysicalConstruct(addrHR)
+        addrLog=stas.addrLogicalConstruct(addrHR)
+        addrBuildLUT(stas)
+        self.assert_(stas.addrLogicalLUT is not None)
+        self.assert_(np.all(stas.addrPhysicalLogical(addrPhys) == addrLog))
+        self.assert_(np.all(stas.addrLogicalPhysical(addrLog) == addrPhys))
+
+    def testAddrSpecEncode(self):
+        stas=addrSpec(addrConf=[{'id':'x','range':range(32),'type':1,'shift':3},
+                                {'id':'s','range':range(4),'type':-1,'shift':0},
+                                {'id':'y','range':range(8),'type':1,'shift':8}])
+        addr=np.array([[0, 5, 31], [3, 1, 0], [7, 0, 2]], 'uint32')
+        addrPhys=stas.encode(addr)
+        self.assert_(np.all(addrPhys == [(0<<3)+3+(7<<8), (5<<3)+1, (31<<3)+(2<<8)]))
+        self.assert_(np.all(stas.decode(addrPhys) == addr))
+        self.assert_(np.all(stas.addrPhysicalConstruct(addr) == addrPhys))
+        addrLog=stas.addrLogicalConstruct(addr)
+        self.assert_(np.all(addrLog == [0+7*32+.75, 5+.25, 31+2*32]))
+        self.assert_(np.all(stas.addrLogicalExtract(addrLog) == addr))
+
+    def testIsValidAddressRange(self):
+        stas=addrSpec(addrConf=[{'id':'x','range':range(0,32,2),'type':1,'shift':0},
+                                {'id':'y','range':range(8),'type':1,'shift':5}])
+        nEntries, addr=isValidAddress(stas, np.array([[0, 4, 30], [1, 7, 0]]))
+        self.assertEqual(nEntries, 3)
+        with self.assertRaises(AssertionError) as cm:
+            isValidAddress(stas, np.array([[0, 3, 30, 40], [1, 7, 8, 0]]))
+        self.assert_(np.all(cm.exception.args[1] == [1, 3]))
+        nEntries, addr=isValidAddress(stas, np.array([[3], [1]]), trusted=True)
+        self.assert_(np.all(addr == [[3], [1]]))
+
+    def testBuildGrid(self):
+        grid=_buildGrid([[0,1],[0,2,3]])
+        self.assertEqual(grid.tolist(), [[0,0],[0,2],[0,3],[1,0],[1,2],[1,3]])
+        self.assertEqual(grid.dtype, np.uint32)
+        self.assert_(_buildGrid([[0,1],[0,2,3]]) is not grid)
+        #Memoized grids are shared, hence read-only
+        grid=_buildGrid([[0,1],[0,2,3]], memoize=True)
+        self.failIf(grid.flags.writeable)
+        self.assert_(_buildGrid([range(2),[0,2,3]], memoize=True) is grid)
+        self.assertEqual(_buildGrid([[], range(3)]).shape, (0, 2))
+
+    def testExtract(self):
+        #Interleaved events of channels 0 and 1 keep their order when demultiplexed
+        addr=[self.STcsMon.addrPhysicalConstruct({0:[range(10),5,1]}),
+              self.STcsMon.addrPhysicalConstruct({1:[range(10),2]})]
+        ad=np.column_stack([addr[0], addr[1]]).flatten()
+        evs=events(np.column_stack([ad, np.arange(len(ad))]))
+        ch_evs=self.STcsMon.extract(evs)
+        self.assertEqual(sorted(ch_evs.keys()), [0, 1])
+        for ch in [0, 1]:
+            self.assert_(np.all(ch_evs.get_ad(ch) == addr[ch]))
+            self.assert_(np.all(ch_evs.get_tm(ch) == np.arange(ch, len(ad), 2)))
+
+    def testImportExportAERFile(self):
+        from pyNCS.pyST.STas import aerFile
+        self.STcsSeq.exportAER(self.ch_events,filename='aerout.aer',format='b')
+        self.tmp_files.append('aerout.aer')
+        evs=self.STcsSeq.exportAER(self.ch_events,isi=False)
+        aer=aerFile('aerout.aer')
+        self.assert_(np.all(aer.data==evs.data))
+        self.assertEqual(aer.channel_addressing().nChannels, self.STcsSeq.nChannels)
+        #Only the requested time window is decoded
+        t0,t1=evs.get_tm()[len(evs)/3],evs.get_tm()[len(evs)/2]
+        ch_evs=self.STcsSeq.importAER(aer,t_start=t0,t_stop=t1)
+        tm=evs.get_tm()
+        self.assertEqual(ch_evs.get_nev(),np.sum((tm>=t0)&(tm<t1)))
+        for ch in ch_evs:
+            self.assert_(np.all(ch_evs.get_tm(ch)>=t0))
+            self.assert_(np.all(ch_evs.get_tm(ch)<t1))
+
+    def testRawOutputWindow(self):
+        evs=self.STcsMon.exportAER(self.ch_events,isi=False)
+        raw_out=self.STcsMon.rawoutput_from_chevents(self.STcsMon.extract(evs),normalize=False)
+        raw_out_full=self.STcsMon.rawoutput_from_chevents(self.STcsMon.extract(evs),normalize=False)
+        ids=self.ch_events[1].id_list()[:3]
+        for t0,t1 in [(10,20),(0,49),(30,30)]:
+            sl=raw_out.window(1,t0,t1)
+            self.assert_(1 in raw_out.raw_data)
+            self.assert_(np.all(sl.raw_data()==raw_out_full[1].time_slice(t0,t1).raw_data()))
+            self.assert_(np.all(sl.id_list()==raw_out_full[1].id_list()))
+            sl=raw_out.window(1,t0,t1,ids=ids)
+            self.assert_(np.all(sl.id_list()==np.sort(ids)))
+            self.assert_(np.all(sl.raw_data()==raw_out_full.window(1,t0,t1,ids=ids).raw_data()))
+        #Windows are cached
+        self.assert_(raw_out.window(1,10,20) is raw_out.window(1,10,20))
+
+    def testRawOutputParallelDecode(self):
+        ch_evs=self.STcsMon.extract(self.STcsMon.exportAER(self.ch_events,isi=False))
+        raw_out=self.STcsMon.rawoutput_from_chevents(ch_evs,normalize=False)
+        raw_out_par=self.STcsMon.rawoutput_from_chevents(ch_evs,normalize=False,n_workers=2)
+        raw_out_par.decode_all_channels()
+        self.assertEqual(len(raw_out_par.raw_data),0)
+        for ch in [0,1]:
+            self.assert_(np.all(raw_out[ch].raw_data()==raw_out_par[ch].raw_data()))
+
     def tearDown(self):
         for i in self.tmp_files:
             #os.remove(i)